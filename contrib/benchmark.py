@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+"""Parse, timestamp and memory benchmarks for inning_all.xml decoding.
+
+Usage: python contrib/benchmark.py [inning_all.xml | --synthetic] [games]
+
+By default the full game in contrib/inning_all.xml is used; --synthetic
+builds a uniform 9 inning game instead. The memory benchmark holds `games` copies of the game (default 243, a tenth
+of a season) and extrapolates to a 2430 game season.
+"""
+
+import datetime
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+import defusedxml.ElementTree as ElementTree
+import pytz
+
+from pygd2 import gamefeed
+from pygd2 import inning
+from pygd2 import timestamps
+
+SEASON_GAMES = 2430
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inning_all.xml')
+
+
+def synthetic_inning_all(innings=9, atbats=4, pitches=4, seed=0):
+    """Builds an inning_all.xml document as bytes."""
+    rand = random.Random(seed)
+    out = ['<game atBat="1" deck="2" hole="3" ind="F">']
+    num = 0
+    for inn in range(1, innings + 1):
+        out.append('<inning num="%d" away_team="lan" home_team="cin" next="Y">' % inn)
+        for half in ('top', 'bottom'):
+            out.append('<%s>' % half)
+            for _ in range(atbats):
+                num += 1
+                out.append(
+                    '<atbat num="%d" b="1" s="2" o="1" start_tfs="191530" '
+                    'start_tfs_zulu="2017-06-18T19:15:30Z" batter="%d" stand="R" '
+                    'b_height="6-2" pitcher="%d" p_throws="L" des="Batter grounds out." '
+                    'des_es="" event_num="%d" event="Groundout" event_es="" '
+                    'play_guid="ab-%d" home_team_runs="1" away_team_runs="2">'
+                    % (num, 400000 + num % 30, 500000 + inn, num, num))
+                for pid in range(pitches):
+                    out.append(
+                        '<pitch des="Ball" des_es="" id="%d" type="%s" tfs="191531" '
+                        'tfs_zulu="2017-06-18T19:15:31Z" x="%.2f" y="%.2f" event_num="%d" '
+                        'sv_id="170618_191531" play_guid="p-%d-%d" start_speed="%.1f" '
+                        'end_speed="85.1" sz_top="3.4" sz_bot="1.6" pfx_x="-5.2" pfx_z="9.1" '
+                        'px="%.3f" pz="%.3f" x0="-1.5" y0="50.0" z0="5.9" vx0="4.9" '
+                        'vy0="-135.1" vz0="-6.3" ax="-8.1" ay="29.4" az="-16.3" break_y="23.8" '
+                        'break_angle="21.6" break_length="4.2" pitch_type="%s" '
+                        'type_confidence="2.000" zone="%d" nasty="33" spin_dir="210.1" '
+                        'spin_rate="2212.5" cc="" mt=""/>'
+                        % (pid, rand.choice('BSX'), rand.uniform(0, 200), rand.uniform(0, 200),
+                           pid, num, pid, rand.uniform(80, 99), rand.uniform(-2, 2),
+                           rand.uniform(0, 4), rand.choice(['FF', 'SL', 'CH', 'CU']),
+                           rand.randint(1, 14)))
+                out.append('<runner id="123" start="" end="1B" event="Single" event_num="9"/>')
+                out.append('</atbat>')
+            out.append('</%s>' % half)
+        out.append('</inning>')
+    out.append('</game>')
+    return '\n'.join(out).encode()
+
+
+def _json_lits(mapping):
+    """The json.loads coercion inning.Game.from_etree used before schemas."""
+    out = {}
+    for key, val in mapping.items():
+        try:
+            out[key] = json.loads(val)
+        except json.JSONDecodeError:
+            out[key] = str(val)
+    return out
+
+
+def _best(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def bench_convert(root):
+    """Attribute coercion: json.loads per value vs. compiled schema."""
+    attribs = [elem.attrib for elem in root.iter('pitch')]
+    legacy = _best(lambda: [_json_lits(a) for a in attribs], 5)
+    compiled = _best(lambda: [inning._pitch_attrs(a) for a in attribs], 5)
+    print("convert %d pitch attribute maps: json.loads %.2f ms, schema %.2f ms (%.1fx)"
+          % (len(attribs), legacy * 1e3, compiled * 1e3, legacy / compiled))
+
+
+def bench_from_etree(root):
+    """Game.from_etree throughput."""
+    npitches = sum(1 for _ in root.iter('pitch'))
+    elapsed = _best(lambda: inning.Game.from_etree(root), 5)
+    print("from_etree: %.2f ms per game, %d pitches/s" % (elapsed * 1e3, npitches / elapsed))
+
+
+def bench_timestamps(root):
+    """tfs/tfs_zulu decoding: strptime + localize vs. fixed-format parsing."""
+    tfs = [elem.get('tfs') for elem in root.iter('pitch')]
+    zulu = [elem.get('tfs_zulu') for elem in root.iter('pitch')]
+    strptime = datetime.datetime.strptime
+
+    def legacy():
+        for raw_tfs, raw_zulu in zip(tfs, zulu):
+            pytz.utc.localize(strptime(raw_tfs, "%H%M%S")).timetz()
+            pytz.utc.localize(strptime(raw_zulu, "%Y-%m-%dT%H:%M:%SZ"))
+
+    def fast():
+        for raw_tfs, raw_zulu in zip(tfs, zulu):
+            timestamps.parse_tfs(raw_tfs)
+            timestamps.parse_zulu(raw_zulu)
+
+    def epoch():
+        for raw_zulu in zulu:
+            timestamps.zulu_epoch(raw_zulu)
+
+    base = _best(legacy, 5)
+    for label, func in (('fixed-format', fast), ('zulu epoch only', epoch)):
+        elapsed = _best(func, 5)
+        print("timestamps %d pitches: strptime %.2f ms, %s %.2f ms (%.1fx)"
+              % (len(tfs), base * 1e3, label, elapsed * 1e3, base / elapsed))
+
+
+class _Plain(object):
+    """Stand-in for the pre-__slots__ record classes."""
+
+
+def _unslotted(game):
+    def plain(obj, **children):
+        out = _Plain()
+        out.__dict__.update((name, getattr(obj, name)) for name in type(obj).__slots__)
+        out.__dict__.update(children)
+        return out
+    return plain(game, innings=tuple(
+        plain(inn, atbats=tuple(
+            plain(ab, pitches=tuple(plain(p) for p in ab.pitches),
+                  runners=tuple(plain(r) for r in ab.runners))
+            for ab in inn.atbats))
+        for inn in game.innings))
+
+
+def _traced(build):
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def bench_memory(root, games):
+    """Memory held by parsed games, with and without __slots__."""
+    npitches = sum(1 for _ in root.iter('pitch'))
+    for label, count in (('1 game', 1), ('%d games' % games, games)):
+        slotted = _traced(lambda: [inning.Game.from_etree(root) for _ in range(count)])
+        plain = _traced(lambda: [_unslotted(inning.Game.from_etree(root)) for _ in range(count)])
+        print("memory %s: __dict__ %.1f MB, __slots__ %.1f MB (%.0f%% less), %d B/pitch"
+              % (label, plain / 1e6, slotted / 1e6, 100 * (1 - slotted / plain),
+                 slotted / (npitches * count)))
+    season = slotted / games * SEASON_GAMES
+    print("memory season estimate (%d games): __dict__ %.0f MB, __slots__ %.0f MB"
+          % (SEASON_GAMES, plain / games * SEASON_GAMES / 1e6, season / 1e6))
+    mapping = {name: '1' for name in gamefeed.EXIT_VELOCITY_SCHEMA}
+    slotted = _traced(lambda: [gamefeed.ExitVelocity(**mapping) for _ in range(10000)])
+    print("memory 10000 ExitVelocity rows: __slots__ %.1f MB" % (slotted / 1e6))
+
+
+def main(argv):
+    source = argv[1] if len(argv) > 1 else FIXTURE
+    if source == '--synthetic':
+        data = synthetic_inning_all()
+    else:
+        with open(source, 'rb') as xmlfp:
+            data = xmlfp.read()
+    root = ElementTree.fromstring(data)
+    bench_convert(root)
+    bench_timestamps(root)
+    bench_from_etree(root)
+    bench_memory(root, int(argv[2]) if len(argv) > 2 else 243)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -1,3 +1,4 @@
+from pygd2.pygd2 import DayIndex, GameId, day_index
 from pygd2.pygd2 import get_batting_stats_by_name
 from pygd2.pygd2 import get_color_feed
 from pygd2.pygd2 import get_game_attribs
@@ -8,7 +9,11 @@ from pygd2.pygd2 import get_player_by_id
 from pygd2.pygd2 import get_player_by_name
 from pygd2.pygd2 import get_player_stats
 from pygd2.pygd2 import get_player_stats_by_name
+from pygd2.pygd2 import get_players_stats
+from pygd2.pygd2 import stored_player_stats, refresh_player_stats
 from pygd2.pygd2 import game
-from pygd2.pygd2 import list_games
+from pygd2.pygd2 import list_games, list_game_ids
 from pygd2.pygd2 import league_info, division_info, team_info
 from pygd2.pygd2 import game_context_metrics
+from pygd2.pygd2 import innings_all, iter_innings_all, InningsTracker
+from pygd2.pygd2 import pitch_table, pitch_tables
@@ -0,0 +1,302 @@
+"""Asyncio counterparts of the pygd2 fetch functions.
+
+Requires aiohttp (pip install pygd2[aio]). Requests share the rate limiter,
+response cache and timeout of the synchronous transport, and at most
+`concurrency` requests per Client are in flight at once.
+
+    async with pygd2.aio.Client() as client:
+        games = await pygd2.aio.list_games(date, client=client)
+        await pygd2.aio.reload(games, client=client)
+"""
+
+import asyncio
+import contextlib
+import datetime
+import json
+import logging
+
+import defusedxml.ElementTree as ElementTree
+from bs4 import BeautifulSoup
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from pygd2 import cache as response_cache
+from pygd2 import gamefeed
+from pygd2 import inning
+from pygd2 import linescore
+from pygd2 import objcache
+from pygd2 import pygd2
+from pygd2 import transport
+
+LOG = logging.getLogger(__name__)
+
+# Default number of requests in flight per Client
+CONCURRENCY = 8
+
+
+class Client(object):
+    """Async HTTP client mirroring transport.Transport.
+
+    Args:
+        concurrency: Max requests in flight at once.
+        limit_per_host: Max open connections per host.
+        transport: Transport whose limiter, cache and timeout are shared
+            (the shared Transport by default).
+    """
+
+    def __init__(self, concurrency=CONCURRENCY, limit_per_host=transport.POOL_MAXSIZE,
+                 transport=None):
+        if aiohttp is None:
+            raise ImportError("pygd2.aio requires aiohttp (pip install pygd2[aio])")
+        self.transport = transport
+        self.concurrency = concurrency
+        self.limit_per_host = limit_per_host
+        self.session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        if self.transport is None:
+            self.transport = transport.get_transport()
+        timeout = self.transport.timeout
+        if isinstance(timeout, tuple):
+            timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        else:
+            timeout = aiohttp.ClientTimeout(total=timeout)
+        connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get(self, url):
+        """Sends a GET request, going through the shared cache and limiter.
+        Args:
+            url: URL to request.
+        Returns:
+            A cache.CachedResponse holding the full body.
+        """
+        cache = self.transport.cache
+        entry = cache.lookup(url) if cache else None
+        if entry is not None and entry.fresh:
+            cached = cache.response(entry)
+            if cached is not None:
+                cache.hits += 1
+                return cached
+        headers = entry.validators() if entry is not None else {}
+        limiter = self.transport.limiter
+        async with self._semaphore:
+            if limiter:
+                await limiter.acquire_async(url)
+            async with self.session.get(url, headers=headers) as resp:
+                body = await resp.read()
+                response = response_cache.CachedResponse(
+                    url, resp.status, body, resp.headers, resp.get_encoding())
+                response.from_cache = False
+        if cache:
+            if response.status_code == 304 and entry is not None:
+                cached = cache.response(entry, not_modified=True)
+                if cached is not None:
+                    cache.refresh(entry)
+                    cache.revalidated += 1
+                    return cached
+            cache.misses += 1
+            if response.status_code == 200:
+                cache.store(url, response)
+        return response
+
+
+@contextlib.asynccontextmanager
+async def _client(client):
+    if client is not None:
+        yield client
+        return
+    async with Client() as new_client:
+        yield new_client
+
+
+async def get_xml(url, client=None):
+    """Gets XML from a URL.
+    Args:
+        url: URL where the xml is.
+        client: Client to use (a temporary one if None).
+    Returns:
+        ElementTree of the XML file, or None
+    """
+    LOG.debug("Request to xml URL: %s", url)
+    async with _client(client) as client:
+        response = await client.get(url)
+    if response.status_code != 200:
+        LOG.error("Request to %s: status %s", url, response.status_code)
+        return None
+    return ElementTree.fromstring(response.text)
+
+
+async def get_json(url, client=None):
+    """Gets JSON from a url.
+    Args:
+        url: URL where the JSON is.
+        client: Client to use (a temporary one if None).
+    Returns:
+        json of the JSON response, or none.
+    """
+    LOG.debug("Request to json URL: %s", url)
+    async with _client(client) as client:
+        response = await client.get(url)
+    if response.status_code != 200:
+        LOG.error("Request to %s: status %s", url, response.status_code)
+        return None
+    if len(response.content) == 0:
+        return {}
+    return json.loads(response.text)
+
+
+async def get_soup(url, client=None):
+    """Returns HTML soup from a url.
+    Args:
+        url: URL where the soup is.
+        client: Client to use (a temporary one if None).
+    Returns:
+        BeautifulSoup of the HTML file, or None
+    """
+    LOG.debug("Request to html URL: %s", url)
+    async with _client(client) as client:
+        response = await client.get(url)
+    if response.status_code != 200:
+        LOG.error("Request to %s: status %s", url, response.status_code)
+        return None
+    return BeautifulSoup(response.text, 'html.parser')
+
+
+async def day_index(date, client=None):
+    """Gets the pygd2.DayIndex for a date, sharing the synchronous memo.
+    Args:
+        date: Date to get the listing for.
+        client: Client to use (a temporary one if None).
+    Returns:
+        pygd2.DayIndex, or None if the listing couldn't be fetched.
+    """
+    index = pygd2._DAY_INDEXES.get(date)
+    if index is not None:
+        return index
+    url = pygd2.GD_URL_PRE + pygd2.GD_DATE_FMT.format(date.year, date.month, date.day)
+    LOG.debug("Request to html URL: %s", url)
+    async with _client(client) as client:
+        response = await client.get(url)
+    if response.status_code != 200:
+        LOG.error("Request to %s: status %s", url, response.status_code)
+        return None
+    index = pygd2.DayIndex.from_html(date, response.text)
+    pygd2._DAY_INDEXES.put(index)
+    return index
+
+
+async def list_games(date, team_code=None, client=None):
+    """Lists the games on a date as (unloaded) linescore.Game objects.
+    Args:
+        date: Date to list games for.
+        team_code: Only list games involving this team code.
+        client: Client to use (a temporary one if None).
+    Returns:
+        List of linescore.Game.
+    """
+    index = await day_index(date, client)
+    if index is None:
+        return []
+    return [linescore.Game(gid.gid) for gid in index.for_team(team_code)]
+
+
+async def reload(games, client=None):
+    """Reloads linescore.Game objects concurrently.
+
+    Games whose linescore couldn't be fetched are logged and left as they
+    were, so one missing file doesn't abort the rest.
+    Args:
+        games: Iterable of linescore.Game.
+        client: Client to use (a temporary one if None).
+    Returns:
+        List of the games that were reloaded.
+    """
+    games = list(games)
+
+    async def _reload(game, client):
+        data = await get_json(game.gameday_url, client)
+        if not data:
+            LOG.error("Couldn't reload %s", game.gameday_id)
+            return None
+        game.load_data(data['data']['game'])
+        return game
+
+    async with _client(client) as client:
+        results = await asyncio.gather(*(_reload(game, client) for game in games))
+    return [game for game in results if game is not None]
+
+
+async def get_game_details(year, month, day, client=None):
+    """Gets the linescore.json game mappings for every game on a date.
+    Args:
+        year, month, day: Date to get games for.
+        client: Client to use (a temporary one if None).
+    Returns:
+        List of game mappings.
+    """
+    async with _client(client) as client:
+        index = await day_index(datetime.date(year, month, day), client)
+        if index is None:
+            return []
+        urls = [index.game_url(gid, "linescore.json") for gid in index]
+        results = await asyncio.gather(*(get_json(url, client) for url in urls))
+    return [data['data']['game'] for data in results if data]
+
+
+async def innings_all(game_id, lazy=False, client=None):
+    """Gets a game's inning_all.xml as an inning.Game.
+
+    Goes through the object cache like pygd2.innings_all, if enabled;
+    cached games are always fully built.
+    Args:
+        game_id: Gameday id of the game.
+        lazy: Build innings, at-bats and pitches only when accessed.
+        client: Client to use (a temporary one if None).
+    Returns:
+        inning.Game, or None if the file couldn't be fetched.
+    """
+    url = pygd2._build_gameday_url(game_id, 'inning', 'inning_all.xml')
+    objects = objcache.get_cache()
+    if objects is None:
+        xml = await get_xml(url, client)
+        return inning.Game.from_etree(xml, lazy) if xml is not None else None
+    obj = objects.load_final('inning_all', game_id, url)
+    if obj is not None:
+        return obj
+    async with _client(client) as client:
+        response = await client.get(url)
+    if response.status_code != 200:
+        LOG.error("Request to %s: status %s", url, response.status_code)
+        return None
+    return objects.load_body('inning_all', game_id, url, response.content,
+                             lambda body: inning.Game.from_etree(ElementTree.fromstring(body)))
+
+
+async def game_feed(game_pk, client=None):
+    """Gets the gamefeed.ExitVelocity rows of a game.
+    Returns:
+        List of gamefeed.ExitVelocity, or None if the request failed.
+    """
+    url = "https://baseballsavant.mlb.com/gf?game_pk=%s" % game_pk
+    data = await get_json(url, client)
+    if not data:
+        return None
+    return [gamefeed.ExitVelocity(**mapping) for mapping in data.get('exit_velocity', [])]
@@ -0,0 +1,151 @@
+"""Memory-mapped pitch archive.
+
+An archive is a directory holding pitches.bin, the raw fixed-width records
+of table.DTYPE back to back, and archive.json, the record count, category
+labels and archived game ids. Opening an archive maps pitches.bin with
+numpy.memmap, so columns are NumPy views over the page cache and nothing is
+deserialized; scanning seasons of pitches costs only the pages touched.
+
+Category codes (game, stand, p_throws, type, pitch_type) are interned
+across the whole archive, with int32 game codes so decades of games fit,
+and batter/pitcher are stored as their integer gameday ids. Records are
+appended before the index is atomically replaced, so an interrupted append
+leaves the archive as it was.
+
+    archive = pygd2.archive.PitchArchive('pitches')
+    archive.extend(pygd2.pitch_table(game_id) for game_id in game_ids)
+    pitches = archive.table()
+    speeds = pitches['start_speed'][pitches.labels('pitch_type') == 'FF']
+
+Requires numpy (pip install pygd2[table]).
+"""
+
+import json
+import os
+import threading
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from pygd2 import table
+
+DATA_NAME = 'pitches.bin'
+INDEX_NAME = 'archive.json'
+
+# 2: int32 game codes
+FORMAT_VERSION = 2
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("pygd2.archive requires numpy (pip install pygd2[table])")
+
+
+class PitchArchive(object):
+    """Append-only, memory-mappable archive of PitchTable rows.
+
+    Args:
+        path: Archive directory, created if missing.
+    """
+
+    def __init__(self, path):
+        _require_numpy()
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.dtype = numpy.dtype(table.DTYPE)
+        self.count = 0
+        self.categories = {name: [] for name in table.CATEGORY_NAMES}
+        self.games = []
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        index_path = os.path.join(self.path, INDEX_NAME)
+        if os.path.exists(index_path):
+            with open(index_path) as indexfp:
+                index = json.load(indexfp)
+            if index['version'] != FORMAT_VERSION or index['itemsize'] != self.dtype.itemsize \
+                    or index['fields'] != list(self.dtype.names):
+                raise ValueError("Archive %s doesn't match the pitch record layout." % self.path)
+            self.count = index['count']
+            self.categories = {name: list(index['categories'].get(name, ()))
+                               for name in table.CATEGORY_NAMES}
+            self.games = index['games']
+
+    def __len__(self):
+        return self.count
+
+    def _write_index(self):
+        index = {
+            'version': FORMAT_VERSION,
+            'itemsize': self.dtype.itemsize,
+            'fields': list(self.dtype.names),
+            'count': self.count,
+            'categories': self.categories,
+            'games': self.games,
+        }
+        index_path = os.path.join(self.path, INDEX_NAME)
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w') as indexfp:
+            json.dump(index, indexfp)
+            indexfp.flush()
+            os.fsync(indexfp.fileno())
+        os.replace(tmp_path, index_path)
+
+    def extend(self, tables):
+        """Appends PitchTables, skipping games already archived.
+        Args:
+            tables: Iterable of PitchTable (None items are ignored).
+        Returns:
+            Number of records appended.
+        """
+        with self._lock:
+            archived = set(self.games)
+            codes = {name: {label: code for code, label in enumerate(labels)}
+                     for name, labels in self.categories.items()}
+            data_path = os.path.join(self.path, DATA_NAME)
+            appended = 0
+            added_games = []
+            with open(data_path, 'ab') as datafp:
+                # Drop records past count left by an interrupted append
+                datafp.truncate(self.count * self.dtype.itemsize)
+                for tbl in tables:
+                    if tbl is None:
+                        continue
+                    games = tbl.categories['game']
+                    keep = [code for code, game in enumerate(games) if game not in archived]
+                    if games and not keep:
+                        continue
+                    data = tbl.data
+                    if len(keep) < len(games):
+                        data = data[numpy.isin(data['game'], keep)]
+                    data = numpy.array(data, dtype=self.dtype)
+                    new_games = [games[code] for code in keep]
+                    for name in table.CATEGORY_NAMES:
+                        remap = numpy.array(
+                            [table._code(codes[name], label) for label in tbl.categories[name]]
+                            + [-1], dtype=self.dtype[name])
+                        data[name] = remap[data[name]]
+                    datafp.write(data.tobytes())
+                    appended += len(data)
+                    archived.update(new_games)
+                    added_games.extend(new_games)
+                datafp.flush()
+                os.fsync(datafp.fileno())
+            self.count += appended
+            self.games.extend(added_games)
+            self.categories = {name: sorted(labels, key=labels.get)
+                               for name, labels in codes.items()}
+            self._write_index()
+            return appended
+
+    def table(self):
+        """Maps the archive as a read-only PitchTable without copying.
+        Returns:
+            table.PitchTable whose data is a numpy.memmap.
+        """
+        categories = {name: tuple(labels) for name, labels in self.categories.items()}
+        if not self.count:
+            return table.PitchTable(numpy.empty(0, dtype=self.dtype), categories)
+        data = numpy.memmap(os.path.join(self.path, DATA_NAME), dtype=self.dtype,
+                            mode='r', shape=(self.count,))
+        return table.PitchTable(data, categories)
@@ -0,0 +1,106 @@
+"""Bulk inning_all.xml decoding on a process pool.
+
+Parsing is pure Python and CPU bound, so threads don't help; these
+functions spread raw payloads or local files (e.g. from pygd2.crawl)
+across a ProcessPoolExecutor. Workers send back compact results rather
+than object graphs: PitchTables (a few NumPy arrays) or pickled
+inning.Game bytes to load when needed.
+
+    paths = glob.glob('gameday/year_2017/**/inning_all.xml', recursive=True)
+    pitches = pygd2.table.concat(pygd2.bulk.decode_tables(paths, workers=32))
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import pickle
+import re
+
+import defusedxml.ElementTree as ElementTree
+
+from pygd2 import inning
+from pygd2 import table
+
+# Sources handed to a worker at a time
+CHUNKSIZE = 8
+
+PROTOCOL = 5
+
+_GID_RE = re.compile(r"gid_(\d{4}_\d{2}_\d{2}_\w+?_\d+)")
+
+
+def game_id_from_path(path):
+    """Gets the gameday id from a gid_ directory in a path, or None."""
+    match = _GID_RE.search(os.fspath(path))
+    return match.group(1) if match else None
+
+
+def _is_payload(source):
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def _decode_table(job):
+    source, game_id = job
+    if _is_payload(source):
+        return table.PitchTable.from_etree(ElementTree.fromstring(bytes(source)), game_id)
+    return table.PitchTable.from_source(os.fspath(source), game_id)
+
+
+def _decode_game(job):
+    source, _ = job
+    if _is_payload(source):
+        root = ElementTree.fromstring(bytes(source))
+    else:
+        root = ElementTree.parse(os.fspath(source)).getroot()
+    return pickle.dumps(inning.Game.from_etree(root), protocol=PROTOCOL)
+
+
+def _jobs(sources, game_ids):
+    sources = list(sources)
+    if game_ids is None:
+        game_ids = [None if _is_payload(source) else game_id_from_path(source)
+                    for source in sources]
+    else:
+        game_ids = list(game_ids)
+        if len(game_ids) != len(sources):
+            raise ValueError("Got %d game ids for %d sources." % (len(game_ids), len(sources)))
+    return list(zip(sources, game_ids))
+
+
+def _map(decode, jobs, workers, chunksize):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(decode, jobs, chunksize=chunksize):
+            yield result
+
+
+def decode_tables(sources, game_ids=None, workers=None, chunksize=CHUNKSIZE):
+    """Decodes inning_all.xml payloads or files into PitchTables in parallel.
+    Args:
+        sources: Iterable of raw XML bytes or file paths.
+        game_ids: Gameday ids recorded in each table's game column; by
+            default taken from a gid_ directory in each path.
+        workers: Worker processes (default os.cpu_count()).
+        chunksize: Sources sent to a worker at a time.
+    Yields:
+        table.PitchTable per source, in order.
+    """
+    return _map(_decode_table, _jobs(sources, game_ids), workers, chunksize)
+
+
+def decode_games(sources, workers=None, chunksize=CHUNKSIZE):
+    """Decodes inning_all.xml payloads or files into pickled inning.Games.
+
+    Games come back as pickle bytes so the parent process only pays for
+    unpickling the ones it uses (see load_game).
+    Args:
+        sources: Iterable of raw XML bytes or file paths.
+        workers: Worker processes (default os.cpu_count()).
+        chunksize: Sources sent to a worker at a time.
+    Yields:
+        Pickled inning.Game bytes per source, in order.
+    """
+    return _map(_decode_game, _jobs(sources, None), workers, chunksize)
+
+
+def load_game(data):
+    """Loads an inning.Game from decode_games output."""
+    return pickle.loads(data)
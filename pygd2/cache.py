@@ -0,0 +1,304 @@
+"""Persistent HTTP response cache.
+
+Bodies are stored once per SHA-256 digest in a sqlite file and URLs point at
+them, so identical responses share storage. Freshness comes from a TTL
+policy keyed on the URL; stale entries are revalidated with If-None-Match /
+If-Modified-Since and the least recently used entries are evicted once the
+cache grows past its size bound.
+"""
+
+import datetime
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Environment variable naming the cache file used by the default Transport
+CACHE_ENV = 'PYGD2_HTTP_CACHE'
+
+# Default size bound in bytes
+MAX_BYTES = 1 << 30
+
+# TTLs in seconds; IMMUTABLE entries are never revalidated
+IMMUTABLE = None
+LIVE_TTL = 15
+DEFAULT_TTL = 300
+
+# Gameday URLs for dates this many days in the past are treated as final
+FINAL_AFTER_DAYS = 2
+
+_DATE_RE = re.compile(r"year_(\d{4})/month_(\d{1,2})/day_(\d{1,2})")
+_SEASON_RE = re.compile(r"[?&]season=(\d{4})")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    encoding TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched REAL NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+"""
+
+
+def default_ttl(url):
+    """Default TTL policy.
+
+    Gameday files for dates more than FINAL_AFTER_DAYS ago and stats for past
+    seasons never change; anything else dated today or later is live.
+    Args:
+        url: Request URL.
+    Returns:
+        TTL in seconds, or IMMUTABLE.
+    """
+    today = datetime.date.today()
+    match = _DATE_RE.search(url)
+    if match:
+        year, month, day = (int(g) for g in match.groups())
+        try:
+            date = datetime.date(year, month, day)
+        except ValueError:
+            return DEFAULT_TTL
+        if (today - date).days >= FINAL_AFTER_DAYS:
+            return IMMUTABLE
+        return LIVE_TTL
+    match = _SEASON_RE.search(url)
+    if match and int(match.group(1)) < today.year:
+        return IMMUTABLE
+    return DEFAULT_TTL
+
+
+class TTLPolicy(object):
+    """TTL policy from (regex, ttl) rules, falling back to default_ttl.
+
+    Args:
+        rules: Sequence of (pattern, ttl) pairs; the first pattern found in
+            the URL wins. ttl is seconds or IMMUTABLE.
+        fallback: Policy for URLs no rule matches.
+    """
+
+    def __init__(self, rules=(), fallback=default_ttl):
+        self.rules = [(re.compile(pattern), ttl) for pattern, ttl in rules]
+        self.fallback = fallback
+
+    def __call__(self, url):
+        for pattern, ttl in self.rules:
+            if pattern.search(url):
+                return ttl
+        return self.fallback(url)
+
+
+class CachedResponse(object):
+    """Response served from the cache, with the parts of the requests.Response
+    API used by PyGD2."""
+
+    def __init__(self, url, status_code, content, headers, encoding, not_modified=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding
+        self.from_cache = True
+        self.not_modified = not_modified
+
+    @property
+    def raw(self):
+        return io.BytesIO(self.content)
+
+    def close(self):
+        pass
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class _Entry(object):
+
+    def __init__(self, url, digest, status, headers, encoding, etag, last_modified, expires):
+        self.url = url
+        self.digest = digest
+        self.status = status
+        self.headers = headers
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+    @property
+    def fresh(self):
+        return self.expires is None or self.expires > time.time()
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache(object):
+    """Size-bounded, content-addressed response cache in a sqlite file.
+
+    Args:
+        path: Path of the sqlite cache file.
+        ttl: Callable mapping a URL to a TTL in seconds or IMMUTABLE.
+        max_bytes: Total body size to keep before evicting LRU entries.
+    """
+
+    def __init__(self, path, ttl=default_ttl, max_bytes=MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _expires(self, url, now):
+        ttl = self.ttl(url)
+        return None if ttl is IMMUTABLE else now + ttl
+
+    def lookup(self, url):
+        """Gets the cache entry for a URL, or None."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT digest, status, headers, encoding, etag, last_modified, expires "
+                "FROM entries WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        digest, status, headers, encoding, etag, last_modified, expires = row
+        return _Entry(url, digest, status, json.loads(headers), encoding, etag,
+                      last_modified, expires)
+
+    def response(self, entry, not_modified=False):
+        """Builds a CachedResponse for an entry and marks it recently used."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE entries SET accessed = ? WHERE url = ?",
+                             (time.time(), entry.url))
+            row = conn.execute("SELECT body FROM blobs WHERE digest = ?",
+                               (entry.digest,)).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(entry.url, entry.status, bytes(row[0]), entry.headers,
+                              entry.encoding, not_modified)
+
+    def refresh(self, entry):
+        """Restarts an entry's TTL after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE entries SET fetched = ?, expires = ? WHERE url = ?",
+                             (now, self._expires(entry.url, now), entry.url))
+
+    def store(self, url, response):
+        """Stores a successful response for a URL."""
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        headers = {key: val for key, val in response.headers.items()
+                   if key.lower() in ('content-type', 'etag', 'last-modified')}
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO blobs (digest, body, size) VALUES (?, ?, ?)",
+                             (digest, sqlite3.Binary(body), len(body)))
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (url, digest, status, headers, encoding, "
+                    "etag, last_modified, fetched, expires, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (url, digest, response.status_code, json.dumps(headers),
+                     response.encoding or getattr(response, 'apparent_encoding', None),
+                     response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                     now, self._expires(url, now), now))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        with conn:
+            rows = conn.execute(
+                "SELECT entries.url, entries.digest, blobs.size FROM entries "
+                "JOIN blobs USING (digest) ORDER BY entries.accessed").fetchall()
+            # Blobs are shared by entries with identical bodies
+            refs = {}
+            for _, digest, _ in rows:
+                refs[digest] = refs.get(digest, 0) + 1
+            for url, digest, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                refs[digest] -= 1
+                if not refs[digest]:
+                    total -= size
+                self.evictions += 1
+            conn.execute("DELETE FROM blobs WHERE digest NOT IN (SELECT digest FROM entries)")
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM entries")
+                conn.execute("DELETE FROM blobs")
+
+    def stats(self):
+        """Gets hit/miss counters and the current size of the cache."""
+        with self._lock:
+            conn = self._connection()
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': size}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def from_env():
+    """Gets a ResponseCache at the path in PYGD2_HTTP_CACHE, or None if unset."""
+    path = os.environ.get(CACHE_ENV)
+    if not path:
+        return None
+    return ResponseCache(path)
@@ -0,0 +1,196 @@
+"""Resumable multi-day gameday crawler.
+
+Files are written under out_dir with the same year_/month_/day_/gid_ layout
+as gd2.mlb.com, and every finished game file is recorded in a JSON
+checkpoint so an interrupted crawl picks up where it stopped. Files and
+days less than cache.FINAL_AFTER_DAYS old are never checkpointed, since
+games may still be in progress, and days whose listing couldn't be
+fetched are left open.
+
+    pygd2.crawl.crawl(datetime.date(2017, 4, 2), datetime.date(2017, 10, 1),
+                      files=['linescore.json', 'inning/inning_all.xml'])
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import datetime
+import json
+import logging
+import os
+import threading
+
+from pygd2 import cache as response_cache
+from pygd2 import pygd2
+from pygd2 import transport
+
+LOG = logging.getLogger(__name__)
+
+# Default files fetched for each game
+FILES = ('linescore.json',)
+
+# Default worker threads; the shared rate limiter still paces requests
+WORKERS = 8
+
+CHECKPOINT_NAME = '.checkpoint.jsonl'
+
+
+class JsonLines(object):
+    """Append-only JSON lines log, replayed through load() when opened.
+
+    Args:
+        path: Path of the log file; loaded if it exists.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as logfp:
+                for line in logfp:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn last line from an interrupted write
+                        continue
+                    self.load(record)
+
+    def load(self, record):
+        """Applies a record read from, or appended to, the log."""
+        raise NotImplementedError
+
+    def append(self, record):
+        with self._lock:
+            self.load(record)
+            with open(self.path, 'a') as logfp:
+                logfp.write(json.dumps(record) + '\n')
+
+
+class Checkpoint(JsonLines):
+    """Finished days and game files, kept as an append-only JSON lines log.
+
+    Args:
+        path: Path of the checkpoint file; loaded if it exists.
+    """
+
+    def __init__(self, path):
+        self.days = set()
+        self.files = set()
+        super().__init__(path)
+
+    def load(self, record):
+        if 'day' in record:
+            self.days.add(record['day'])
+        elif 'file' in record:
+            self.files.add(record['file'])
+
+    def day_done(self, date):
+        return date.isoformat() in self.days
+
+    def file_done(self, game_id, name):
+        return '/'.join((game_id, name)) in self.files
+
+    def mark_day(self, date):
+        self.append({'day': date.isoformat()})
+
+    def mark_file(self, game_id, name):
+        self.append({'file': '/'.join((game_id, name))})
+
+
+def date_range(start, end):
+    """Yields every date from start to end, inclusive."""
+    for offset in range((end - start).days + 1):
+        yield start + datetime.timedelta(days=offset)
+
+
+def game_file_path(out_dir, game_id, name):
+    """Gets the local path a crawled game file is written to."""
+    year, month, day = game_id.split('_')[:3]
+    return os.path.join(out_dir, 'year_' + year, 'month_' + month, 'day_' + day,
+                        'gid_' + game_id, *name.split('/'))
+
+
+def _final(date):
+    # Files of recent dates can still change, so they are refetched on reruns
+    return (datetime.date.today() - date).days >= response_cache.FINAL_AFTER_DAYS
+
+
+def _list_game_ids(date):
+    index = pygd2.day_index(date)
+    if index is None:
+        raise IOError("Listing games for %s failed" % date)
+    return [gid.gid for gid in index]
+
+
+def _fetch_file(game_id, name, out_dir, state):
+    url = pygd2._build_gameday_url(game_id, name)
+    response = transport.get(url)
+    if response.status_code != 200:
+        LOG.error("Request to %s: status %s", url, response.status_code)
+        return None
+    path = game_file_path(out_dir, game_id, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as outfp:
+        outfp.write(response.content)
+    os.replace(tmp_path, path)
+    if _final(datetime.date(*(int(part) for part in game_id.split('_')[:3]))):
+        state.mark_file(game_id, name)
+    return path
+
+
+def crawl(start, end, files=FILES, out_dir='gameday', workers=WORKERS, checkpoint=None):
+    """Crawls game files for every game from start to end.
+    Args:
+        start: First date to crawl.
+        end: Last date to crawl (inclusive).
+        files: Game file names relative to the gid_ directory
+            (e.g. 'linescore.json', 'inning/inning_all.xml').
+        out_dir: Directory the files are written under.
+        workers: Number of worker threads.
+        checkpoint: Path of the checkpoint file (out_dir/.checkpoint.jsonl by
+            default).
+    Returns:
+        Dictionary with the written paths, the number of files skipped
+        because the checkpoint had them, and the (game_id, file) pairs that
+        failed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    state = Checkpoint(checkpoint or os.path.join(out_dir, CHECKPOINT_NAME))
+    days = [date for date in date_range(start, end) if not state.day_done(date)]
+    result = {'written': [], 'skipped': 0, 'failed': []}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        listings = {pool.submit(_list_game_ids, date): date for date in days}
+        jobs_by_day = {}
+        for future in as_completed(listings):
+            date = listings[future]
+            try:
+                game_ids = future.result()
+            except Exception:  # pylint: disable=broad-except
+                LOG.exception("Listing games for %s failed", date)
+                continue
+            jobs = []
+            for game_id in game_ids:
+                for name in files:
+                    if state.file_done(game_id, name):
+                        result['skipped'] += 1
+                        continue
+                    job = pool.submit(_fetch_file, game_id, name, out_dir, state)
+                    jobs.append((game_id, name, job))
+            jobs_by_day[date] = jobs
+        for date, jobs in sorted(jobs_by_day.items()):
+            complete = True
+            for game_id, name, job in jobs:
+                try:
+                    path = job.result()
+                except Exception:  # pylint: disable=broad-except
+                    LOG.exception("Fetching %s for %s failed", name, game_id)
+                    path = None
+                if path is None:
+                    complete = False
+                    result['failed'].append((game_id, name))
+                else:
+                    result['written'].append(path)
+            # Listings and files for recent days can still change, so only
+            # close out days that are final
+            if complete and _final(date):
+                state.mark_day(date)
+    return result
@@ -1,17 +1,58 @@
+"""Player, team and player stat tables.
+
+Nothing touches the disk at import. The database path comes from
+configure(), else the PYGD2_DB environment variable, else pygd2.db in the
+working directory, and is opened on first use. Raw connections are kept per
+thread, in WAL mode so readers don't block the roster writer.
+"""
+
+from collections import OrderedDict
 import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
 
 import sssorm
 
+# Environment variable naming the database file
+DATABASE_ENV = 'PYGD2_DB'
+DATABASE = 'pygd2.db'
+
+# Pragmas applied to every connection
+PRAGMAS = OrderedDict([
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 5000),
+])
+
+_SQL_TYPES = {
+    str: 'TEXT',
+    int: 'INTEGER',
+    float: 'REAL',
+    datetime.datetime: 'TIMESTAMP',
+}
+
 
 def utc_now():
     return datetime.datetime.now(datetime.timezone.utc)
 
 
-class BaseModel(sssorm.Model):
-    pass
+def _fold(name):
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    return ''.join(c for c in decomposed if c.isalnum()).casefold()
 
 
-BaseModel.connect_database('pygd2.db')
+def name_key(first, last):
+    """Normalized lookup key for a player name, ignoring case, accents,
+    spaces and punctuation (Jose Abreu == josé abreu)."""
+    return _fold(first) + ' ' + _fold(last)
+
+
+class BaseModel(sssorm.Model):
+    pass
 
 
 class Team(BaseModel):
@@ -34,9 +75,11 @@ class Player(BaseModel):
     status = str
     team_idx = int
     date_modified = datetime.datetime
+    namekey = str
 
     def __init__(self, gdid, firstname, lastname, number, boxname, throws, bats,
                  position, status, team, date_modified=utc_now, **kwds):
+        kwds.setdefault('namekey', name_key(firstname, lastname))
         super().__init__(gdid=gdid, firstname=firstname, lastname=lastname,
                          number=number, boxname=boxname, throws=throws, bats=bats,
                          position=position, status=status, team_idx=int(team or 0),
@@ -49,3 +92,277 @@ class Player(BaseModel):
     @team.setter
     def team(self, team):
         self.team_idx = team.idx
+
+
+_CONFIG = {'path': None, 'pragmas': PRAGMAS, 'generation': 0}
+_CONFIG_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+def configure(path=None, **pragmas):
+    """Sets the database file and connection pragmas.
+
+    Takes effect for connections opened afterwards; each thread reopens its
+    connection on next use.
+    Args:
+        path: Database file (PYGD2_DB or pygd2.db when None).
+        pragmas: Pragma overrides, e.g. busy_timeout=10000.
+    """
+    global _PREPARED
+    with _CONFIG_LOCK:
+        _CONFIG['path'] = path
+        _CONFIG['pragmas'] = OrderedDict(PRAGMAS, **pragmas)
+        _CONFIG['generation'] += 1
+        _PREPARED = False
+    player_cache.clear()
+
+
+def database_path():
+    """Gets the absolute path of the configured database file."""
+    path = _CONFIG['path'] or os.environ.get(DATABASE_ENV) or DATABASE
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def connect():
+    """Opens a new raw sqlite3 connection to the database the models use."""
+    conn = sqlite3.connect(database_path(), detect_types=sqlite3.PARSE_DECLTYPES)
+    for pragma, value in _CONFIG['pragmas'].items():
+        conn.execute('PRAGMA %s = %s' % (pragma, value))
+    conn.create_function('pygd2_name_key', 2, name_key)
+    return conn
+
+
+def connection():
+    """Gets this thread's raw connection, opening it on first use."""
+    conn = getattr(_LOCAL, 'conn', None)
+    if conn is None or _LOCAL.generation != _CONFIG['generation']:
+        if conn is not None:
+            conn.close()
+        conn = _LOCAL.conn = connect()
+        _LOCAL.generation = _CONFIG['generation']
+    return conn
+
+
+def _columns(model):
+    return [(name, _SQL_TYPES[kind]) for name, kind in vars(model).items()
+            if isinstance(kind, type) and kind in _SQL_TYPES]
+
+
+def ensure_tables(conn):
+    """Creates the Team, Player and PlayerStats tables (as sssorm lays them out: one
+    column per field plus an idx primary key) if missing, adds columns older
+    databases lack, and creates the lookup indexes."""
+    with conn:
+        for model in (Team, Player):
+            table = model.__name__
+            columns = _columns(model)
+            conn.execute('CREATE TABLE IF NOT EXISTS %s (idx INTEGER PRIMARY KEY, %s)'
+                         % (table, ', '.join('%s %s' % column for column in columns)))
+            existing = {row[1] for row in conn.execute('PRAGMA table_info(%s)' % table)}
+            for name, sql_type in columns:
+                if name not in existing:
+                    conn.execute('ALTER TABLE %s ADD COLUMN %s %s' % (table, name, sql_type))
+            conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS %s_gdid ON %s (gdid)'
+                         % (table.lower(), table))
+        conn.execute('UPDATE Player SET namekey = pygd2_name_key(firstname, lastname) '
+                     'WHERE namekey IS NULL')
+        conn.execute('CREATE INDEX IF NOT EXISTS player_name ON Player (lastname, firstname)')
+        conn.execute('CREATE INDEX IF NOT EXISTS player_namekey ON Player (namekey)')
+        conn.execute('CREATE TABLE IF NOT EXISTS PlayerStats (gdid TEXT NOT NULL, '
+                     'season INTEGER NOT NULL, type TEXT NOT NULL, stats TEXT NOT NULL, '
+                     'final INTEGER NOT NULL, fetched REAL NOT NULL, '
+                     'PRIMARY KEY (gdid, season, type))')
+
+
+_PREPARED = False
+_PREPARE_LOCK = threading.Lock()
+
+
+def prepare():
+    """Connects the models and runs ensure_tables, once per configuration."""
+    global _PREPARED
+    with _PREPARE_LOCK:
+        if _PREPARED:
+            return
+        ensure_tables(connection())
+        BaseModel.connect_database(database_path())
+        _PREPARED = True
+
+
+class PlayerCache(object):
+    """Process-level LRU cache of Player rows by gdid and by name key.
+    Args:
+        maxsize: Number of players to keep.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._players = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            player = self._players.get(key)
+            if player is not None:
+                self._players.move_to_end(key)
+            return player
+
+    def put(self, player):
+        with self._lock:
+            for key in (('gdid', str(player.gdid)), ('name', player.namekey)):
+                self._players[key] = player
+                self._players.move_to_end(key)
+            while len(self._players) > self.maxsize * 2:
+                self._players.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._players.clear()
+
+
+player_cache = PlayerCache()
+
+
+def find_player(gdid=None, first=None, last=None):
+    """Looks a player up by gameday id or by name, through player_cache.
+
+    Names match on name_key, so case, accents and punctuation don't matter.
+    Returns:
+        The Player, or None if it isn't in the database.
+    """
+    prepare()
+    if gdid is not None:
+        key = ('gdid', str(gdid))
+        query = {'gdid': str(gdid)}
+    else:
+        key = ('name', name_key(first, last))
+        query = {'namekey': key[1]}
+    player = player_cache.get(key)
+    if player is None:
+        player = Player.get_one(**query)
+        if player is not None:
+            player_cache.put(player)
+    return player
+
+
+def upsert_teams(conn, teams):
+    """Inserts or updates teams in one batch.
+    Args:
+        conn: Connection from connection(); the caller owns the transaction.
+        teams: Iterable of (gdid, abbrev).
+    Returns:
+        Dictionary of team gdid to Team idx.
+    """
+    teams = list(teams)
+    conn.executemany('INSERT INTO Team (gdid, abbrev) VALUES (?, ?) '
+                     'ON CONFLICT (gdid) DO UPDATE SET abbrev = excluded.abbrev', teams)
+    gdids = [gdid for gdid, _ in teams]
+    indexes = {}
+    for start in range(0, len(gdids), 500):
+        chunk = gdids[start:start + 500]
+        rows = conn.execute('SELECT gdid, idx FROM Team WHERE gdid IN (%s)'
+                            % ', '.join('?' * len(chunk)), chunk)
+        indexes.update(rows)
+    return indexes
+
+
+def upsert_players(conn, players):
+    """Inserts or updates players in one batch.
+
+    Existing players keep their names and handedness; their number,
+    position, status, team and date_modified are updated.
+    Args:
+        conn: Connection from connection(), after prepare(); the caller owns
+            the transaction.
+        players: Iterable of dicts with the Player fields, team_idx included.
+    """
+    conn.executemany(
+        'INSERT INTO Player (gdid, firstname, lastname, number, boxname, throws, bats, '
+        'position, status, team_idx, date_modified, namekey) '
+        'VALUES (:gdid, :firstname, :lastname, :number, :boxname, :throws, :bats, '
+        ':position, :status, :team_idx, :date_modified, '
+        'pygd2_name_key(:firstname, :lastname)) '
+        'ON CONFLICT (gdid) DO UPDATE SET number = excluded.number, '
+        'position = excluded.position, status = excluded.status, '
+        'team_idx = excluded.team_idx, date_modified = excluded.date_modified',
+        players)
+
+
+def select_players(conn, gdids):
+    """Loads saved players by gameday id.
+    Args:
+        conn: Connection from connection(), after prepare().
+        gdids: Iterable of player gameday ids.
+    Returns:
+        Dictionary of gdid to Player; ids not stored are left out.
+    """
+    gdids = [str(gdid) for gdid in gdids]
+    players = {}
+    for start in range(0, len(gdids), 500):
+        chunk = gdids[start:start + 500]
+        rows = conn.execute('SELECT idx, gdid, firstname, lastname, number, boxname, throws, '
+                            'bats, position, status, team_idx, date_modified, namekey '
+                            'FROM Player WHERE gdid IN (%s)' % ', '.join('?' * len(chunk)),
+                            chunk)
+        for (idx, gdid, firstname, lastname, number, boxname, throws, bats, position,
+             status, team_idx, date_modified, namekey) in rows:
+            player = Player(gdid, firstname, lastname, number, boxname, throws, bats,
+                            position, status, team_idx, date_modified=date_modified,
+                            namekey=namekey)
+            player.idx = idx
+            players[gdid] = player
+    return players
+
+
+def find_stats(gdid, season, type):  # pylint: disable=redefined-builtin
+    """Looks up stored stat rows for a player season.
+    Args:
+        gdid: Player gameday id.
+        season: Season year.
+        type: String type of stats (hitting or pitching).
+    Returns:
+        Tuple (list of stat row dicts, final, fetched epoch seconds), or
+        None if not stored.
+    """
+    prepare()
+    row = connection().execute(
+        'SELECT stats, final, fetched FROM PlayerStats '
+        'WHERE gdid = ? AND season = ? AND type = ?',
+        (str(gdid), int(season), type)).fetchone()
+    if row is None:
+        return None
+    rows, final, fetched = row
+    return json.loads(rows), bool(final), fetched
+
+
+def stale_stats(season, type, before):  # pylint: disable=redefined-builtin
+    """Lists players whose stored, non-final stats are older than before.
+    Args:
+        season: Season year.
+        type: String type of stats (hitting or pitching).
+        before: Epoch seconds; rows fetched earlier are stale.
+    Returns:
+        List of gameday ids.
+    """
+    prepare()
+    rows = connection().execute(
+        'SELECT gdid FROM PlayerStats WHERE season = ? AND type = ? AND final = 0 '
+        'AND fetched < ?', (int(season), type, before))
+    return [gdid for gdid, in rows]
+
+
+def upsert_stats(conn, rows):
+    """Inserts or replaces player season stat rows in one batch.
+    Args:
+        conn: Connection from connection(), after prepare(); the caller owns
+            the transaction.
+        rows: Iterable of (gdid, season, type, list of stat row dicts, final).
+    """
+    now = time.time()
+    conn.executemany(
+        'INSERT INTO PlayerStats (gdid, season, type, stats, final, fetched) '
+        'VALUES (?, ?, ?, ?, ?, ?) '
+        'ON CONFLICT (gdid, season, type) DO UPDATE SET stats = excluded.stats, '
+        'final = excluded.final, fetched = excluded.fetched',
+        [(str(gdid), int(season), type, json.dumps(stats), int(final), now)
+         for gdid, season, type, stats, final in rows])
@@ -1,43 +1,38 @@
-import json
+from pygd2 import schema
 
-def _list_lits(alist):
-    out_list = []
-    for value in alist:
-        if isinstance(value, dict):
-            out_list.append(_dict_lits(value))
-        elif isinstance(value, list):
-            out_list.append(_list_lits(value))
-        elif isinstance(value, str):
-            try:
-                out_list.append(json.loads(value))
-            except json.JSONDecodeError:
-                out_list.append(str(value))
-        else:
-            out_list.append(str(value))
-    return out_list
+EXIT_VELOCITY_SCHEMA = {
+    'inning': int, 'ab_number': int, 'outs': int, 'batter': int, 'stand': str,
+    'batter_name': str, 'pitcher': int, 'p_throws': str, 'pitcher_name': str,
+    'team_batting': str, 'team_fielding': str, 'result': str, 'des': str,
+    'events': str, 'sv_id': str, 'strikes': int, 'balls': int,
+    'pre_strikes': int, 'pre_balls': int, 'call': str, 'call_name': str,
+    'pitch_type': str, 'pitch_name': str, 'description': str,
+    'balls_and_strikes': str, 'start_speed': float, 'end_speed': float,
+    'sz_top': float, 'sz_bot': float, 'px': float, 'pz': float,
+    'x0': float, 'z0': float, 'hit_speed': float, 'hit_distance': float,
+    'hit_angle': float, 'is_bip_out': str, 'pitch_number': int,
+    'hc_x': float, 'hc_y': float, 'player_total_pitches': int,
+    'player_total_pitches_pitch_types': int, 'game_total_pitches': int,
+    'rowId': str, 'game_pk': int, 'play_id': str, 'xba': float,
+}
 
-
-def _dict_lits(mapping):
-    out = {}
-    for key, val in mapping.items():
-        if isinstance(val, dict):
-            out[key] = _dict_lits(val)
-        elif isinstance(val, list):
-            out[key] = _list_lits(val)
-        elif isinstance(val, str):
-            try:
-                out[key] = json.loads(val)
-            except json.JSONDecodeError:
-                out[key] = str(val)
-        else:
-            out[key] = str(val)
-    return out
+_exit_velocity_attrs = schema.compile(EXIT_VELOCITY_SCHEMA)
 
 
 class ExitVelocity(object):
+    __slots__ = ('inning', 'ab_number', 'outs', 'batter', 'stand', 'batter_name',
+                 'pitcher', 'p_throws', 'pitcher_name', 'team_batting', 'team_fielding',
+                 'result', 'des', 'events', 'sv_id', 'strikes', 'balls', 'pre_strikes',
+                 'pre_balls', 'call', 'call_name', 'pitch_type', 'pitch_name',
+                 'description', 'balls_and_strikes', 'start_speed', 'end_speed', 'sz_top',
+                 'sz_bot', 'px', 'pz', 'x0', 'z0', 'hit_speed', 'hit_distance',
+                 'hit_angle', 'is_bip_out', 'pitch_number', 'hc_x', 'hc_y',
+                 'player_total_pitches', 'player_total_pitches_pitch_types',
+                 'game_total_pitches', 'rowId', 'game_pk', 'play_id', 'xba',
+                 'result_table')
 
     def __init__(self, **kwargs):
-        kwargs = _dict_lits(kwargs)
+        kwargs = _exit_velocity_attrs(kwargs)
         self.inning = kwargs.get('inning')
         self.ab_number = kwargs.get('ab_number')
         self.outs = kwargs.get('outs')
@@ -1,26 +1,70 @@
-import datetime
-import json
+from collections.abc import Sequence
 
-import pytz
+import defusedxml.ElementTree as ElementTree
+
+from pygd2 import schema
+from pygd2 import timestamps
+
+PITCH_SCHEMA = {
+    'des': str, 'des_es': str, 'id': int, 'type': str, 'tfs': str, 'tfs_zulu': str,
+    'x': float, 'y': float, 'event_num': int, 'sv_id': str, 'play_guid': str,
+    'start_speed': float, 'end_speed': float, 'sz_top': float, 'sz_bot': float,
+    'pfx_x': float, 'pfx_z': float, 'px': float, 'pz': float,
+    'x0': float, 'y0': float, 'z0': float, 'vx0': float, 'vy0': float, 'vz0': float,
+    'ax': float, 'ay': float, 'az': float,
+    'break_y': float, 'break_angle': float, 'break_length': float,
+    'pitch_type': str, 'type_confidence': float, 'zone': int, 'nasty': int,
+    'spin_dir': float, 'spin_rate': float, 'cc': str, 'mt': str,
+}
+
+RUNNER_SCHEMA = {
+    'id': int, 'start': str, 'end': str, 'event': str, 'event_num': int,
+}
+
+ATBAT_SCHEMA = {
+    'num': int, 'b': int, 's': int, 'o': int, 'start_tfs': str, 'start_tfs_zulu': str,
+    'batter': int, 'stand': str, 'b_height': str, 'pitcher': int, 'p_throws': str,
+    'des': str, 'des_es': str, 'event_num': int, 'event': str, 'event_es': str,
+    'play_guid': str, 'home_team_runs': int, 'away_team_runs': int,
+}
+
+INNING_SCHEMA = {
+    'num': int, 'away_team': str, 'home_team': str, 'next': str,
+}
+
+GAME_SCHEMA = {
+    'atBat': int, 'deck': int, 'hole': int, 'ind': str,
+}
+
+_pitch_attrs = schema.compile(PITCH_SCHEMA)
+_runner_attrs = schema.compile(RUNNER_SCHEMA)
+_atbat_attrs = schema.compile(ATBAT_SCHEMA)
+_inning_attrs = schema.compile(INNING_SCHEMA)
+_game_attrs = schema.compile(GAME_SCHEMA)
 
 
 class Pitch(object):
+    __slots__ = ('des', 'des_es', 'id_', 'type', '_tfs_raw', '_tfs', '_tfs_zulu_raw',
+                 '_tfs_zulu', 'x', 'y', 'event_num', 'sv_id', 'play_guid', 'start_speed',
+                 'end_speed', 'sz_top', 'sz_bot', 'pfx_x', 'pfx_z', 'px', 'pz', 'x0', 'y0',
+                 'z0', 'vx0', 'vy0', 'vz0', 'ax', 'ay', 'az', 'break_y', 'break_angle',
+                 'break_length', 'pitch_type', 'type_confidence', 'zone', 'nasty',
+                 'spin_dir', 'spin_rate', 'cc', 'mt')
+
+    tfs = timestamps.LazyTimestamp('_tfs_raw', '_tfs', timestamps.parse_tfs)
+    tfs_zulu = timestamps.LazyTimestamp('_tfs_zulu_raw', '_tfs_zulu', timestamps.parse_zulu)
+    tfs_zulu_epoch = timestamps.LazyEpoch('_tfs_zulu_raw', '_tfs_zulu')
 
     def __init__(self, **kwds):
         # pylint: disable=I0011,C0103
-        strptime = datetime.datetime.strptime
         self.des = kwds.get('ball')
         self.des_es = kwds.get('des_es')
         self.id_ = kwds.get('id')
         self.type = kwds.get('type')
-        try:
-            self.tfs = pytz.utc.localize(strptime(str(kwds['tfs']), "%H%M%S")).timetz()
-        except KeyError:
-            self.tfs = None
-        try:
-            self.tfs_zulu = pytz.utc.localize(strptime(kwds['tfs_zulu'], "%Y-%m-%dT%H:%M:%SZ"))
-        except KeyError:
-            self.tfs_zulu = None
+        self._tfs_raw = kwds.get('tfs')
+        self._tfs = timestamps.UNSET
+        self._tfs_zulu_raw = kwds.get('tfs_zulu')
+        self._tfs_zulu = timestamps.UNSET
         self.x = kwds.get('x')
         self.y = kwds.get('y')
         self.event_num = kwds.get('event_num')
@@ -57,6 +101,7 @@ class Pitch(object):
 
 
 class Runner(object):
+    __slots__ = ('id', 'start', 'end', 'event', 'event_num')
 
     def __init__(self, **kwds):
         # pylint: disable=I0011,C0103
@@ -68,23 +113,25 @@ class Runner(object):
 
 
 class AtBat(object):
+    __slots__ = ('num', 'b', 's', 'o', '_tfs_raw', '_tfs', '_tfs_zulu_raw', '_tfs_zulu',
+                 'batter', 'stand', 'b_height', 'pitcher', 'p_throws', 'des', 'des_es',
+                 'event_num', 'event', 'event_es', 'play_guid', 'home_team_runs',
+                 'away_team_runs', 'pitches', 'runners')
+
+    tfs = timestamps.LazyTimestamp('_tfs_raw', '_tfs', timestamps.parse_tfs)
+    tfs_zulu = timestamps.LazyTimestamp('_tfs_zulu_raw', '_tfs_zulu', timestamps.parse_zulu)
+    tfs_zulu_epoch = timestamps.LazyEpoch('_tfs_zulu_raw', '_tfs_zulu')
 
     def __init__(self, **kwds):
         # pylint: disable=I0011,C0103
-        strptime = datetime.datetime.strptime
         self.num = kwds.get('num')
         self.b = kwds.get('b')
         self.s = kwds.get('s')
         self.o = kwds.get('o')
-        try:
-            self.tfs = pytz.utc.localize(strptime(str(kwds['start_tfs']), "%H%M%S")).timetz()
-        except KeyError:
-            self.tfs = None
-        try:
-            self.tfs_zulu = pytz.utc.localize(strptime(kwds['start_tfs_zulu'],
-                                                       "%Y-%m-%dT%H:%M:%SZ"))
-        except KeyError:
-            self.tfs_zulu = None
+        self._tfs_raw = kwds.get('start_tfs')
+        self._tfs = timestamps.UNSET
+        self._tfs_zulu_raw = kwds.get('start_tfs_zulu')
+        self._tfs_zulu = timestamps.UNSET
         self.batter = kwds.get('batter')
         self.stand = kwds.get('stand')
         self.b_height = kwds.get('b_height')
@@ -103,6 +150,7 @@ class AtBat(object):
 
 
 class Inning(object):
+    __slots__ = ('num', 'away_team', 'home_team', 'next', 'atbats')
 
     def __init__(self, **kwds):
         # pylint: disable=I0011,C0103
@@ -112,18 +160,34 @@ class Inning(object):
         self.next = kwds.get('next')
         self.atbats = None
 
+    @classmethod
+    def from_etree(cls, c_inn, previous=None):
+        """Builds an Inning from an <inning> element (e.g. an inning_N.xml root).
 
-def _dict_lits(mapping):
-    out = {}
-    for key, val in mapping.items():
-        try:
-            out[key] = json.loads(val)
-        except json.JSONDecodeError:
-            out[key] = str(val)
-    return out
+        With a previous build of the same inning, its finished at-bats are
+        reused instead of rebuilt: an at-bat is reused when its num matches
+        and it has the same number of pitches, except for the previous last
+        at-bat, which may have been in progress.
+        Args:
+            c_inn: The <inning> element.
+            previous: Inning built from an earlier copy of the element.
+        """
+        inning = cls(**_inning_attrs(c_inn.attrib))
+        done = {}
+        if previous is not None and previous.atbats:
+            done = {str(atbat.num): atbat for atbat in previous.atbats[:-1]}
+        atbats = []
+        for c_ab in (c_ab for c_top in c_inn for c_ab in c_top):
+            atbat = done.get(c_ab.get('num'))
+            if atbat is None or len(atbat.pitches) != sum(1 for c in c_ab if c.tag == 'pitch'):
+                atbat = _atbat_from_etree(c_ab)
+            atbats.append(atbat)
+        inning.atbats = tuple(atbats)
+        return inning
 
 
 class Game(object):
+    __slots__ = ('atBat', 'deck', 'hole', 'ind', 'innings')
 
     def __init__(self, **kwds):
         # pylint: disable=I0011,C0103
@@ -134,26 +198,151 @@ class Game(object):
         self.innings = None
 
     @classmethod
-    def from_etree(cls, root):
-        game = Game(**_dict_lits(root.attrib))
-        innings = []
-        for c_inn in root:
-            inning = Inning(**_dict_lits(c_inn.attrib))
-            atbats = []
-            for c_ab in (c_ab for c_top in c_inn for c_ab in c_top):
-                atbat = AtBat(**_dict_lits(c_ab.attrib))
-                pitches = []
-                runners = []
-                for c_pitch in (c for c in c_ab if c.tag == 'pitch'):
-                    pitch = Pitch(**_dict_lits(c_pitch.attrib))
-                    pitches.append(pitch)
-                for c_runner in (c for c in c_ab if c.tag == 'runner'):
-                    runner = Runner(**_dict_lits(c_runner.attrib))
-                    runners.append(runner)
-                atbat.pitches = tuple(pitches)
-                atbat.runners = tuple(runners)
-                atbats.append(atbat)
-            inning.atbats = tuple(atbats)
-            innings.append(inning)
-        game.innings = tuple(innings)
+    def from_etree(cls, root, lazy=False):
+        """Builds a Game from a parsed inning_all.xml root element.
+
+        With lazy=True, innings, at-bats, pitches and runners are built from
+        the tree only when first accessed and then cached, so jobs touching
+        a few at-bats skip building the rest.
+        """
+        game = Game(**_game_attrs(root.attrib))
+        if lazy:
+            game.innings = LazyTuple(list(root), _lazy_inning)
+            return game
+        game.innings = tuple(Inning.from_etree(c_inn) for c_inn in root)
         return game
+
+
+def _atbat_from_etree(c_ab):
+    atbat = AtBat(**_atbat_attrs(c_ab.attrib))
+    pitches = []
+    runners = []
+    for c_pitch in (c for c in c_ab if c.tag == 'pitch'):
+        pitch = Pitch(**_pitch_attrs(c_pitch.attrib))
+        pitches.append(pitch)
+    for c_runner in (c for c in c_ab if c.tag == 'runner'):
+        runner = Runner(**_runner_attrs(c_runner.attrib))
+        runners.append(runner)
+    atbat.pitches = tuple(pitches)
+    atbat.runners = tuple(runners)
+    return atbat
+
+
+class LazyTuple(Sequence):
+    """Read-only sequence that builds its items from elements on first access.
+    Args:
+        elements: Source elements, one per item.
+        build: Function building an item from an element.
+    """
+
+    __slots__ = ('_elements', '_build', '_items')
+
+    def __init__(self, elements, build):
+        self._elements = elements
+        self._build = build
+        self._items = [None] * len(elements)
+
+    def __len__(self):
+        return len(self._elements)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._build(self._elements[index])
+        return item
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, LazyTuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return 'LazyTuple(%d items, %d built)' % (
+            len(self), sum(1 for item in self._items if item is not None))
+
+    def __reduce__(self):
+        # Materialize when pickled rather than dragging the tree along
+        return (tuple, (tuple(self),))
+
+
+def _lazy_inning(c_inn):
+    inning = Inning(**_inning_attrs(c_inn.attrib))
+    inning.atbats = LazyTuple([c_ab for c_top in c_inn for c_ab in c_top], _lazy_atbat)
+    return inning
+
+
+def _lazy_atbat(c_ab):
+    atbat = AtBat(**_atbat_attrs(c_ab.attrib))
+    atbat.pitches = LazyTuple([c for c in c_ab if c.tag == 'pitch'], _pitch_from_etree)
+    atbat.runners = LazyTuple([c for c in c_ab if c.tag == 'runner'], _runner_from_etree)
+    return atbat
+
+
+def _pitch_from_etree(c_pitch):
+    return Pitch(**_pitch_attrs(c_pitch.attrib))
+
+
+def _runner_from_etree(c_runner):
+    return Runner(**_runner_attrs(c_runner.attrib))
+
+
+def iter_atbat_elements(source):
+    """Incrementally parses an inning_all.xml, yielding atbat elements.
+
+    Each element is cleared once the consumer moves on, and finished innings
+    are dropped from the tree, so memory stays flat however long the game.
+    Args:
+        source: Filename or binary file object (e.g. a streamed response).
+    Yields:
+        Tuples of (inning attributes, top, atbat element), where top is True
+        for the top half.
+    """
+    inning_attrib = None
+    top = None
+    root = None
+    for event, elem in ElementTree.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            elif elem.tag == 'inning':
+                inning_attrib = elem.attrib
+            elif elem.tag in ('top', 'bottom'):
+                top = elem.tag == 'top'
+        elif elem.tag == 'atbat':
+            yield inning_attrib, top, elem
+            elem.clear()
+        elif elem.tag == 'inning':
+            root.clear()
+
+
+def iter_atbats(source):
+    """Incrementally parses an inning_all.xml, yielding at-bats as they end.
+
+    Parsing starts before the download finishes when source is a stream.
+    Args:
+        source: Filename or binary file object (e.g. a streamed response).
+    Yields:
+        Tuples of (Inning, top, AtBat), where top is True for the top half.
+        The Inning's atbats are left as None.
+    """
+    inning = None
+    inning_attrib = None
+    for attrib, top, c_ab in iter_atbat_elements(source):
+        if attrib is not inning_attrib:
+            inning_attrib = attrib
+            inning = Inning(**_inning_attrs(attrib))
+        yield inning, top, _atbat_from_etree(c_ab)
+
+
+def iter_pitches(source):
+    """Incrementally parses an inning_all.xml, yielding every pitch.
+    Args:
+        source: Filename or binary file object (e.g. a streamed response).
+    Yields:
+        Tuples of (Inning, top, AtBat, Pitch).
+    """
+    for inning, top, atbat in iter_atbats(source):
+        for pitch in atbat.pitches:
+            yield inning, top, atbat, pitch
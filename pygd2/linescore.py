@@ -1,7 +1,9 @@
 import datetime
+import json
 
 import pytz
 
+from pygd2 import objcache
 from pygd2 import pygd2
 
 
@@ -49,7 +51,7 @@ class _Pitcher(object):
                    pitcher.get('last_name'),
                    pitcher.get('first_name'),
                    pitcher.get('name_display_roster'),
-                   None if pitcher['era'] == '-' else float(pitcher['era']),
+                   None if pitcher.get('era', '-') == '-' else float(pitcher['era']),
                    int(pitcher.get('wins', 0)),
                    int(pitcher.get('losses', 0)),
                    int(pitcher.get('saves', 0)))
@@ -84,9 +86,24 @@ class Game(object):
         self.tiebreaker = None
         self.game_pk = None
         self.venue = None
+        self.current_pitcher = None
 
     def reload(self):
-        data = pygd2.get_json(self.gameday_url)['data']['game']
+        objects = objcache.get_cache()
+        if objects is None:
+            self.load_data(pygd2.get_json(self.gameday_url)['data']['game'])
+            return
+        game = objects.load('linescore', self.gameday_id, self.gameday_url, self._parse)
+        if game is not None:
+            self.__dict__.update(game.__dict__)
+
+    def _parse(self, body):
+        game = Game(self.gameday_id)
+        game.load_data(json.loads(body)['data']['game'])
+        return game
+
+    def load_data(self, data):
+        """Loads the game from the 'game' mapping of a linescore.json."""
         def _fix_dashes(data):
             out = {}
             for key, val in data.items():
@@ -143,3 +160,5 @@ class Game(object):
         self.tiebreaker = data.get('tiebreaker_sw') == 'Y'
         self.game_pk = data.get('game_pk')
         self.venue = data.get('venue')
+        current = data.get('current_pitcher')
+        self.current_pitcher = _Pitcher.from_mapping(current) if isinstance(current, dict) else None
@@ -0,0 +1,299 @@
+"""Live game polling with change detection.
+
+Poller tracks any number of games through their linescore.json, polling
+each one on its own schedule: every PREGAME_INTERVAL before the first
+pitch, every LIVE_INTERVAL while in progress, every DELAYED_INTERVAL while
+delayed or suspended, and not at all once Final (or otherwise over).
+Requests are conditional (If-None-Match / If-Modified-Since) and unchanged
+bodies are not reparsed. Each new linescore is diffed against the last one
+and the differences are delivered as Events, to callbacks or through an
+async iterator.
+
+    poller = pygd2.live.Poller(pygd2.list_game_ids(datetime.date.today()))
+    poller.subscribe(print)
+    poller.run()
+
+    async for event in poller.events():
+        ...
+"""
+
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import hashlib
+import logging
+import threading
+import time
+
+import requests
+
+from pygd2 import linescore
+from pygd2 import transport
+
+LOG = logging.getLogger(__name__)
+
+# Poll intervals in seconds
+PREGAME_INTERVAL = 5 * 60
+LIVE_INTERVAL = 10
+WRAPUP_INTERVAL = 60
+DELAYED_INTERVAL = 15 * 60
+ERROR_INTERVAL = 30
+
+# Concurrent polls; the shared rate limiter still paces requests
+WORKERS = 8
+
+PREGAME_STATUSES = ('Preview', 'Pre-Game', 'Warmup', 'Scheduled')
+WRAPUP_STATUSES = ('Game Over',)
+DELAYED_STATUSES = ('Delayed', 'Delayed Start', 'Suspended')
+FINAL_STATUSES = ('Final', 'Completed Early', 'Postponed', 'Cancelled', 'Forfeit')
+
+# Event kinds
+STATUS_CHANGE = 'status_change'
+INNING_CHANGE = 'inning_change'
+RUN_SCORED = 'run_scored'
+PITCHER_CHANGE = 'pitcher_change'
+FINAL = 'final'
+
+Event = namedtuple('Event', ('kind', 'game_id', 'game', 'detail'))
+Event.__doc__ = """A change in a tracked game.
+
+kind is one of the event kinds, game the linescore.Game after the change
+and detail a dict describing it.
+"""
+
+
+def _status(game):
+    # Statuses may carry a reason, e.g. "Delayed: Rain" or "Final: Tied"
+    return (game.status or '').split(':')[0].strip()
+
+
+def _pitcher_id(game):
+    pitcher = game.current_pitcher
+    return pitcher.gdid if pitcher is not None else None
+
+
+def _inning_runs(game):
+    return {inn.inning: (inn.away_runs, inn.home_runs) for inn in game.linescore or ()}
+
+
+def diff(before, after):
+    """Lists the changes between two loads of a game.
+    Args:
+        before: Previous linescore.Game, or None for the first load.
+        after: Current linescore.Game.
+    Returns:
+        List of Events, in STATUS_CHANGE, INNING_CHANGE, RUN_SCORED,
+        PITCHER_CHANGE, FINAL order.
+    """
+    game_id = after.gameday_id
+    events = []
+    if before is None or before.status != after.status:
+        events.append(Event(STATUS_CHANGE, game_id, after,
+                            {'before': before.status if before else None,
+                             'after': after.status}))
+    if before is None:
+        return events
+    old, new = before.state, after.state
+    if (old.inning, old.top) != (new.inning, new.top) and new.inning:
+        events.append(Event(INNING_CHANGE, game_id, after,
+                            {'before': (old.inning, old.top), 'after': (new.inning, new.top)}))
+    old_innings, new_innings = _inning_runs(before), _inning_runs(after)
+    scored = False
+    for num in sorted(new_innings):
+        old_runs = old_innings.get(num, (0, 0))
+        for team, runs, prev in zip(('away', 'home'), new_innings[num], old_runs):
+            if runs > prev:
+                scored = True
+                events.append(Event(RUN_SCORED, game_id, after,
+                                    {'team': team, 'inning': num, 'runs': runs - prev,
+                                     'score': new.runs}))
+    if not scored:
+        # Linescore innings missing or lagging the totals
+        for side, team in enumerate(('away', 'home')):
+            if new.runs[side] > old.runs[side]:
+                events.append(Event(RUN_SCORED, game_id, after,
+                                    {'team': team, 'inning': new.inning,
+                                     'runs': new.runs[side] - old.runs[side],
+                                     'score': new.runs}))
+    if _pitcher_id(before) != _pitcher_id(after) and after.current_pitcher is not None:
+        events.append(Event(PITCHER_CHANGE, game_id, after,
+                            {'before': before.current_pitcher, 'after': after.current_pitcher}))
+    if _status(after) in FINAL_STATUSES:
+        events.append(Event(FINAL, game_id, after, {'score': new.runs}))
+    return events
+
+
+def interval(game, now=None):
+    """Gets the seconds until a game should be polled again.
+    Args:
+        game: linescore.Game.
+        now: Current time as an aware datetime (default now).
+    Returns:
+        Seconds, or None once the game is final.
+    """
+    status = _status(game)
+    if status in FINAL_STATUSES:
+        return None
+    if status in WRAPUP_STATUSES:
+        return WRAPUP_INTERVAL
+    if status in DELAYED_STATUSES:
+        return DELAYED_INTERVAL
+    if status in PREGAME_STATUSES:
+        if game.start_time_utc is None:
+            return PREGAME_INTERVAL
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        until_start = (game.start_time_utc - now).total_seconds()
+        return min(PREGAME_INTERVAL, max(LIVE_INTERVAL, until_start))
+    return LIVE_INTERVAL
+
+
+class _Tracked(object):
+    """Polling state of one game."""
+
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.url = linescore.Game(game_id).gameday_url
+        self.game = None
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+        self.due = 0.0
+
+    def headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class Poller(object):
+    """Polls live games and emits change Events.
+
+    Args:
+        game_ids: Gameday ids to track.
+        callbacks: Callables taking an Event.
+        workers: Concurrent polls.
+    """
+
+    def __init__(self, game_ids=(), callbacks=(), workers=WORKERS):
+        self.workers = workers
+        self.callbacks = list(callbacks)
+        self._tracked = {}
+        self._lock = threading.Lock()
+        for game_id in game_ids:
+            self.track(game_id)
+
+    def track(self, game_id):
+        """Starts polling a game."""
+        with self._lock:
+            self._tracked.setdefault(game_id, _Tracked(game_id))
+
+    def untrack(self, game_id):
+        """Stops polling a game."""
+        with self._lock:
+            self._tracked.pop(game_id, None)
+
+    def subscribe(self, callback):
+        """Registers a callable run with every Event."""
+        self.callbacks.append(callback)
+
+    @property
+    def game_ids(self):
+        with self._lock:
+            return list(self._tracked)
+
+    def game(self, game_id):
+        """Gets the last loaded linescore.Game for a tracked game, or None."""
+        tracked = self._tracked.get(game_id)
+        return tracked.game if tracked is not None else None
+
+    def _fetch(self, tracked):
+        """Gets the new game data, or None if it is unchanged."""
+        response = transport.get(tracked.url, headers=tracked.headers())
+        if response.status_code == 304 or getattr(response, 'not_modified', False):
+            return None
+        if response.status_code != requests.codes.ok:
+            raise IOError("Request to %s: status %s" % (tracked.url, response.status_code))
+        digest = hashlib.sha256(response.content).digest()
+        if digest == tracked.digest:
+            return None
+        tracked.etag = response.headers.get('ETag')
+        tracked.last_modified = response.headers.get('Last-Modified')
+        tracked.digest = digest
+        return response.json()['data']['game']
+
+    def _poll(self, tracked):
+        events = []
+        try:
+            data = self._fetch(tracked)
+            if data is not None:
+                game = linescore.Game(tracked.game_id)
+                game.load_data(data)
+                events = diff(tracked.game, game)
+                tracked.game = game
+        except (IOError, ValueError, KeyError, TypeError) as err:
+            LOG.warning("Polling %s failed: %s", tracked.game_id, err)
+            # Forget the body so the same content is parsed again next time
+            tracked.etag = tracked.last_modified = tracked.digest = None
+            tracked.due = time.time() + ERROR_INTERVAL
+            return []
+        wait = interval(tracked.game) if tracked.game is not None else LIVE_INTERVAL
+        if wait is None:
+            self.untrack(tracked.game_id)
+        else:
+            tracked.due = time.time() + wait
+        return events
+
+    def poll_once(self):
+        """Polls every game that is due and delivers the changes.
+        Returns:
+            List of Events.
+        """
+        now = time.time()
+        with self._lock:
+            due = [tracked for tracked in self._tracked.values() if tracked.due <= now]
+        events = []
+        if due:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for game_events in pool.map(self._poll, due):
+                    events.extend(game_events)
+        for event in events:
+            for callback in self.callbacks:
+                try:
+                    callback(event)
+                except Exception:  # pylint: disable=broad-except
+                    LOG.exception("Callback failed for %s", event.kind)
+        return events
+
+    def wait_time(self):
+        """Seconds until the next game is due, or None if nothing is tracked."""
+        with self._lock:
+            if not self._tracked:
+                return None
+            return max(0.0, min(tracked.due for tracked in self._tracked.values()) - time.time())
+
+    def run(self):
+        """Polls until every tracked game is final."""
+        while True:
+            self.poll_once()
+            wait = self.wait_time()
+            if wait is None:
+                return
+            time.sleep(wait)
+
+    async def events(self):
+        """Async iterator over Events until every tracked game is final.
+
+        Polls run in the default executor so the event loop isn't blocked.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            for event in await loop.run_in_executor(None, self.poll_once):
+                yield event
+            wait = self.wait_time()
+            if wait is None:
+                return
+            await asyncio.sleep(wait)
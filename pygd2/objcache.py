@@ -0,0 +1,197 @@
+"""On-disk cache of parsed games.
+
+Parsed inning.Game and linescore.Game objects are pickled (protocol 5) to
+one file per game, named after the kind, gameday id and a hash of the
+source body they were parsed from, so a cached object is only used for the
+exact content it came from. Objects parsed after the HTTP cache policy
+treated their source as final are marked final and loaded without
+refetching the source at all.
+
+Off by default; set PYGD2_OBJECT_CACHE to a directory or call configure().
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+
+import requests
+
+from pygd2 import cache as response_cache
+from pygd2 import transport
+
+LOG = logging.getLogger(__name__)
+
+# Environment variable naming the cache directory
+CACHE_ENV = 'PYGD2_OBJECT_CACHE'
+
+PROTOCOL = 5
+
+# Hex digits of the source hash kept in file names
+DIGEST_LENGTH = 16
+
+# File suffix of objects parsed from a source that was already final
+FINAL_SUFFIX = '.final.pickle'
+
+
+class ObjectCache(object):
+    """Directory of pickled parsed games.
+
+    Args:
+        directory: Cache directory, created on first store.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.hits = 0
+        self.misses = 0
+
+    def _pattern(self, kind, game_id, suffix='.pickle'):
+        return os.path.join(self.directory, kind, '%s-*%s' % (game_id, suffix))
+
+    def _path(self, kind, game_id, digest, final=False):
+        return os.path.join(self.directory, kind, '%s-%s%s' % (
+            game_id, digest, FINAL_SUFFIX if final else '.pickle'))
+
+    def lookup(self, kind, game_id, digest=None):
+        """Loads a cached object.
+        Args:
+            kind: Object kind, e.g. 'inning_all'.
+            game_id: Gameday id of the game.
+            digest: Source hash; None accepts only a version stored as final.
+        Returns:
+            Tuple (object, final), or None if it isn't cached.
+        """
+        if digest is None:
+            paths = [(path, True) for path in glob.glob(self._pattern(kind, game_id, FINAL_SUFFIX))]
+        else:
+            paths = [(self._path(kind, game_id, digest, final), final) for final in (True, False)]
+        for path, final in paths:
+            try:
+                with open(path, 'rb') as objfp:
+                    return pickle.load(objfp), final
+            except FileNotFoundError:
+                continue
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as err:
+                LOG.warning("Dropping unreadable cache file %s: %s", path, err)
+                os.remove(path)
+        return None
+
+    def store(self, kind, game_id, digest, obj, final=False):
+        """Pickles an object, replacing older versions of the same game.
+        Args:
+            final: The source was already immutable when fetched, so the
+                object can be served later without revalidating it.
+        """
+        path = self._path(kind, game_id, digest, final)
+        stale = [old for old in glob.glob(self._pattern(kind, game_id)) if old != path]
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as objfp:
+            pickle.dump(obj, objfp, protocol=PROTOCOL)
+        os.replace(tmp_path, path)
+        for old in stale:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+
+    def load_final(self, kind, game_id, url):
+        """Gets an object stored as final, if its source is final by now.
+        Args:
+            kind: Object kind, e.g. 'inning_all'.
+            game_id: Gameday id of the game.
+            url: URL of the source file.
+        Returns:
+            The cached object, or None if the source has to be fetched.
+        """
+        if response_cache.default_ttl(url) is not response_cache.IMMUTABLE:
+            return None
+        cached = self.lookup(kind, game_id)
+        if cached is None:
+            return None
+        self.hits += 1
+        return cached[0]
+
+    def load_body(self, kind, game_id, url, body, parse):
+        """Gets the object for a fetched source body, parsing it if needed.
+
+        A version stored while the game was live is marked final once its
+        body is confirmed unchanged after the game became final.
+        Args:
+            kind: Object kind, e.g. 'inning_all'.
+            game_id: Gameday id of the game.
+            url: URL the body was fetched from.
+            body: Source body bytes.
+            parse: Function building the object from the source body bytes.
+        Returns:
+            The parsed object.
+        """
+        final = response_cache.default_ttl(url) is response_cache.IMMUTABLE
+        digest = hashlib.sha256(body).hexdigest()[:DIGEST_LENGTH]
+        cached = self.lookup(kind, game_id, digest)
+        if cached is not None:
+            self.hits += 1
+            obj, stored_final = cached
+            if final and not stored_final:
+                self.store(kind, game_id, digest, obj, final=True)
+            return obj
+        self.misses += 1
+        obj = parse(body)
+        self.store(kind, game_id, digest, obj, final)
+        return obj
+
+    def load(self, kind, game_id, url, parse):
+        """Gets a parsed object for a URL through the cache.
+
+        Objects stored once their source was final are served without a
+        request. Otherwise the source is fetched (through the HTTP cache, if
+        any) and only parsed if no object was cached for that exact body.
+        Args:
+            kind: Object kind, e.g. 'inning_all'.
+            game_id: Gameday id of the game.
+            url: URL of the source file.
+            parse: Function building the object from the source body bytes.
+        Returns:
+            The parsed object, or None if the source couldn't be fetched.
+        """
+        obj = self.load_final(kind, game_id, url)
+        if obj is not None:
+            return obj
+        response = transport.get(url)
+        if response.status_code != requests.codes.ok:
+            LOG.error("Request to %s: status %s", url, response.status_code)
+            return None
+        return self.load_body(kind, game_id, url, response.content, parse)
+
+
+_CACHE = None
+_CACHE_CONFIGURED = False
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache():
+    """Gets the configured ObjectCache, or None if disabled."""
+    global _CACHE, _CACHE_CONFIGURED
+    with _CACHE_LOCK:
+        if not _CACHE_CONFIGURED:
+            directory = os.environ.get(CACHE_ENV)
+            _CACHE = ObjectCache(directory) if directory else None
+            _CACHE_CONFIGURED = True
+        return _CACHE
+
+
+def configure(directory):
+    """Sets the cache directory; None disables the cache.
+    Returns:
+        The new ObjectCache, or None.
+    """
+    global _CACHE, _CACHE_CONFIGURED
+    with _CACHE_LOCK:
+        _CACHE = ObjectCache(directory) if directory else None
+        _CACHE_CONFIGURED = True
+        return _CACHE
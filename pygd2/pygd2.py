@@ -24,13 +24,14 @@ SOFTWARE.
 PyGD2
 """
 
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import datetime
+import hashlib
 import logging
 import os.path
-import random
 import re
-import sqlite3
+import threading
 import time
 import defusedxml.ElementTree as ElementTree
 
@@ -41,8 +42,11 @@ import yaml
 
 from pygd2 import db
 from pygd2 import linescore
+from pygd2 import objcache
 from pygd2 import inning
 from pygd2 import gamefeed
+from pygd2 import table
+from pygd2 import transport
 
 # Configure logger
 LOG_FMT = '%(levelname)s %(asctime)s %(module)s <%(lineno)d> %(message)s'
@@ -57,15 +61,20 @@ GD_DATE_FMT = "year_{}/month_{:02}/day_{:02d}"
 M_URL_PRE = "http://m.mlb.com/lookup/json/"
 M_STAT_FMT = "named.sport_{}_composed.bam?player_id={}&game_type=%27R%27&league_list_id=%27mlb%27&season={}"
 
-# Set randomized delay range in seconds
-DELAY_MIN = 0.5
-DELAY_MAX = 5
+# Concurrent players.xml fetches in update_gameday_ids
+ROSTER_WORKERS = 8
 
+# Concurrent requests in get_players_stats
+STAT_WORKERS = 8
 
-def delay_fuzzy():
-    """Be kind."""
-    length = random.uniform(DELAY_MIN, DELAY_MAX)
-    time.sleep(length)
+# Stored current-season stats are refetched after this long (seconds)
+STATS_REFRESH_INTERVAL = 6 * 60 * 60
+
+# Lookup misses refresh today's rosters at most this often (seconds)
+ROSTER_REFRESH_INTERVAL = 15 * 60
+
+# Players still missing after a refresh aren't looked up again for this long
+PLAYER_MISS_TTL = 60 * 60
 
 
 def get_xml(url):
@@ -75,9 +84,8 @@ def get_xml(url):
     Returns:
         ElementTree of the XML file, or None
     """
-    delay_fuzzy()
     LOG.debug("Request to xml URL: %s", url)
-    response = requests.get(url)
+    response = transport.get(url)
     if response.status_code != requests.codes.ok:
         LOG.error("Request to %s: status %s", url, response.status_code)
         return None
@@ -91,9 +99,8 @@ def get_json(url):
     Returns:
         json of the JSON response, or none.
     """
-    delay_fuzzy()
     LOG.debug("Request to json URL: %s", url)
-    response = requests.get(url)
+    response = transport.get(url)
     if response.status_code != requests.codes.ok:
         LOG.error("Request to %s: status %s", url, response.status_code)
         return None
@@ -110,8 +117,7 @@ def get_soup(url):
     Returns:
         BeautifulSoup of the HTML file, or None
     """
-    delay_fuzzy()
-    response = requests.get(url)
+    response = transport.get(url)
     LOG.debug("Request to html URL: %s", url)
     if response.status_code != requests.codes.ok:
         LOG.error("Request to %s: status %s", url, response.status_code)
@@ -119,6 +125,133 @@ def get_soup(url):
     return BeautifulSoup(response.text, 'html.parser')
 
 
+class GameId(namedtuple('GameId', ['gid', 'date', 'away', 'home', 'game_number'])):
+    """Gameday id of a game, e.g. 2017_06_18_lanmlb_cinmlb_1."""
+    __slots__ = ()
+
+    def __str__(self):
+        return self.gid
+
+
+class DayIndex(object):
+    """Games listed in a gameday day directory.
+
+    Args:
+        date: Date of the listing.
+        game_ids: Sequence of GameId.
+    """
+
+    GID_RE = re.compile(r"gid_((\d{4})_(\d{2})_(\d{2})_(\w+?)mlb_(\w+?)mlb_(\d+))/")
+
+    def __init__(self, date, game_ids):
+        self.date = date
+        self.gd_date = GD_DATE_FMT.format(date.year, date.month, date.day)
+        self.url = GD_URL_PRE + self.gd_date
+        self.game_ids = tuple(game_ids)
+
+    def __iter__(self):
+        return iter(self.game_ids)
+
+    def __len__(self):
+        return len(self.game_ids)
+
+    @classmethod
+    def from_html(cls, date, html):
+        """Parses the game ids out of a day directory listing."""
+        game_ids = OrderedDict()
+        for res in cls.GID_RE.finditer(html):
+            gid = res.group(1)
+            if gid not in game_ids:
+                year, month, day = (int(g) for g in res.group(2, 3, 4))
+                game_ids[gid] = GameId(gid, datetime.date(year, month, day),
+                                       res.group(5), res.group(6), int(res.group(7)))
+        return cls(date, game_ids.values())
+
+    @classmethod
+    def fetch(cls, date):
+        """Fetches and parses the listing for a date.
+        Args:
+            date: Date to get the listing for.
+        Returns:
+            DayIndex, or None if the listing couldn't be fetched.
+        """
+        url = GD_URL_PRE + GD_DATE_FMT.format(date.year, date.month, date.day)
+        LOG.debug("Request to html URL: %s", url)
+        response = transport.get(url)
+        if response.status_code != requests.codes.ok:
+            LOG.error("Request to %s: status %s", url, response.status_code)
+            return None
+        return cls.from_html(date, response.text)
+
+    def for_team(self, team_code):
+        """Gets the game ids involving a team code (all games if empty)."""
+        if not team_code:
+            return list(self.game_ids)
+        team_code = team_code.lower()
+        return [gid for gid in self.game_ids if team_code in gid.away or team_code in gid.home]
+
+    def game_url(self, game_id, filename=''):
+        """Gets the URL of a game's directory, or of a file in it."""
+        return self.url + '/gid_' + str(game_id) + '/' + filename
+
+
+class _DayIndexMemo(object):
+    """LRU memo of DayIndex by date. Listings for recent dates expire."""
+
+    def __init__(self, maxsize=64, recent_days=2, recent_ttl=300):
+        self.maxsize = maxsize
+        self.recent_days = recent_days
+        self.recent_ttl = recent_ttl
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, date):
+        key = (date.year, date.month, date.day)
+        with self._lock:
+            item = self._indexes.get(key)
+            if item is None:
+                return None
+            index, expires = item
+            if expires is not None and expires < time.monotonic():
+                del self._indexes[key]
+                return None
+            self._indexes.move_to_end(key)
+            return index
+
+    def put(self, index):
+        date = index.date
+        key = (date.year, date.month, date.day)
+        age = (datetime.date.today() - datetime.date(*key)).days
+        expires = None if age >= self.recent_days else time.monotonic() + self.recent_ttl
+        with self._lock:
+            self._indexes[key] = (index, expires)
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.maxsize:
+                self._indexes.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+_DAY_INDEXES = _DayIndexMemo()
+
+
+def day_index(date):
+    """Gets the DayIndex for a date, fetching the listing once per date.
+    Args:
+        date: Date to get the listing for.
+    Returns:
+        DayIndex, or None if the listing couldn't be fetched.
+    """
+    index = _DAY_INDEXES.get(date)
+    if index is None:
+        index = DayIndex.fetch(date)
+        if index is not None:
+            _DAY_INDEXES.put(index)
+    return index
+
+
 def get_players_xml_urls(date):
     """Gets the URLs of the players.xml files for a given date.
     Args:
@@ -128,17 +261,10 @@ def get_players_xml_urls(date):
     """
     if date is None:
         date = datetime.datetime.today()
-    gd_date = GD_DATE_FMT.format(date.year, date.month, date.day)
-    soup = get_soup(GD_URL_PRE + gd_date)
-    if soup is None:
+    index = day_index(date)
+    if index is None:
         return []
-    players = []
-    for link in soup.find_all('a'):
-        href = link.get('href')[7:]
-        if href.startswith("gid_"):
-            xml_url = GD_URL_PRE + gd_date + '/' + href + "players.xml"
-            players.append(xml_url)
-    return players
+    return [index.game_url(gid, "players.xml") for gid in index]
 
 
 def game(gameday_id):
@@ -150,35 +276,17 @@ def game_context_metrics(game_pk):
 
 
 def list_game_ids(date):
-    gd_date = GD_DATE_FMT.format(date.year, date.month, date.day)
-    soup = get_soup(GD_URL_PRE + gd_date)
-    if soup is None:
+    index = day_index(date)
+    if index is None:
         return []
-    games = []
-    regex = r"gid_(\d+_\d+_\d+_(\w+)mlb_(\w+)mlb_1/)"
-    for link in soup.find_all('a'):
-        href = link.get('href')
-        res = re.match(regex, href)
-        if res:
-            gameday_id = res.group(1).rstrip('/')
-            games.append(gameday_id)
-    return games
+    return [gid.gid for gid in index]
 
 
 def list_games(date, team_code=None):
-    gd_date = GD_DATE_FMT.format(date.year, date.month, date.day)
-    soup = get_soup(GD_URL_PRE + gd_date)
-    if soup is None:
+    index = day_index(date)
+    if index is None:
         return []
-    games = []
-    regex = r"gid_(\d+_\d+_\d+_(\w+)mlb_(\w+)mlb_1/)"
-    for link in soup.find_all('a'):
-        href = link.get('href')
-        res = re.match(regex, href)
-        if res and (not team_code or (team_code.lower() in res.group(2) or team_code.lower() in res.group(3))):
-            gameday_id = res.group(1).rstrip('/')
-            games.append(game(gameday_id))
-    return games
+    return [game(gid.gid) for gid in index.for_team(team_code)]
 
 
 def get_game_attribs(date, team):
@@ -193,38 +301,26 @@ def get_game_attribs(date, team):
         pacific = timezone('US/Pacific')
         date = datetime.datetime.now() + pacific.localize(
             datetime.datetime.now()).utcoffset()
-    gd_date = GD_DATE_FMT.format(date.year, date.month, date.day)
-    soup = get_soup(GD_URL_PRE + gd_date)
-    if soup is None:
+    index = day_index(date)
+    if index is None:
         return []
     game_attribs = []
-    regex = r"gid_\d+_\d+_\d+_(\w+)mlb_(\w+)mlb_1/"
-    for link in soup.find_all('a'):
-        href = link.get('href')
-        res = re.match(regex, href)
-        if res and (team in res.group(1) or team in res.group(2)):
-            xml_url = GD_URL_PRE + gd_date + '/' + href + "game.xml"
-            xml = get_xml(xml_url)
-            if xml:
-                game_attribs.append(xml.attrib)
+    for gid in index.for_team(team):
+        xml = get_xml(index.game_url(gid, "game.xml"))
+        if xml:
+            game_attribs.append(xml.attrib)
     return game_attribs
 
 
 def get_game_details(year, month, day):
-    gd_date = GD_DATE_FMT.format(year, month, day)
-    soup = get_soup(GD_URL_PRE + gd_date)
-    if soup is None:
+    index = day_index(datetime.date(year, month, day))
+    if index is None:
         return []
     game_details = []
-    regex = r"gid_\d+_\d+_\d+_(\w+)mlb_(\w+)mlb_1/"
-    for link in soup.find_all('a'):
-        href = link.get('href')
-        res = re.match(regex, href)
-        if res:
-            json_url = GD_URL_PRE + gd_date + '/' + href + "linescore.json"
-            data = get_json(json_url)
-            if data:
-                game_details.append(data['data']['game'])
+    for gid in index:
+        data = get_json(index.game_url(gid, "linescore.json"))
+        if data:
+            game_details.append(data['data']['game'])
     return game_details
 
 
@@ -255,10 +351,13 @@ def get_player_attribs(url):
 
 def update_gameday_ids(year, month, day):
     """Updates the database players table w/ gameday ids from a given date.
+
+    Every players.xml for the date is fetched first; the deduplicated teams
+    and players are then written in a single transaction of batched upserts.
     Args:
         date: Date to get gameday ids from (today if empty).
     Returns:
-        List of the player objects updated in the database.
+        List of the saved Player rows that were updated.
     """
     date = None
     try:
@@ -266,51 +365,53 @@ def update_gameday_ids(year, month, day):
     except ValueError:
         date = datetime.datetime.today()
     players_xml_urls = get_players_xml_urls(date)
-    updated = []
-    for url in players_xml_urls:
-        players = get_player_attribs(url)
-        for player in players:
-            try:
-                for_team = db.Team.get_one(gdid=player['team_id'])
-            except sqlite3.OperationalError as err:
-                if 'no such table' in str(err):
-                    for_team = None
-                else:
-                    raise err
-            if not for_team:
-                for_team = db.Team(gdid=player['team_id'], abbrev=player['team_abbrev'])
-                for_team.create()
-            try:
-                db_player = db.Player.get_one(gdid=player['id'])
-            except sqlite3.OperationalError as err:
-                if 'no such table' in str(err):
-                    db_player = None
-                else:
-                    raise err
-            if not db_player:
-                db_player = db.Player(
-                    firstname=player['first'],
-                    lastname=player['last'],
-                    gdid=player['id'],
-                    number=player['num'],
-                    boxname=player['boxname'],
-                    throws=player['rl'],
-                    bats=player['bats'],
-                    position=player['position'],
-                    status=player['status'],
-                    team=for_team,
-                    date_modified=datetime.datetime.now())
-                db_player.create()
-            else:
-                db_player.gdid = player['id']
-                db_player.number = player['num']
-                db_player.position = player['position']
-                db_player.status = player['status']
-                db_player.team = for_team
-                db_player.date_modified = datetime.datetime.now(datetime.timezone.utc)
-                db_player.update()
-            updated.append(db_player)
-    return updated
+    with ThreadPoolExecutor(max_workers=ROSTER_WORKERS) as pool:
+        rosters = list(pool.map(get_player_attribs, players_xml_urls))
+    players = OrderedDict()
+    teams = OrderedDict()
+    for roster in rosters:
+        for player in roster:
+            players[player['id']] = player
+            teams[player['team_id']] = player['team_abbrev']
+    if not players:
+        return []
+    now = datetime.datetime.now()
+    db.prepare()
+    conn = db.connection()
+    with conn:
+        team_idxs = db.upsert_teams(conn, teams.items())
+        rows = [dict(gdid=player['id'],
+                     firstname=player['first'],
+                     lastname=player['last'],
+                     number=player['num'],
+                     boxname=player['boxname'],
+                     throws=player['rl'],
+                     bats=player['bats'],
+                     position=player['position'],
+                     status=player['status'],
+                     team_idx=team_idxs[player['team_id']],
+                     date_modified=now)
+                for player in players.values()]
+        db.upsert_players(conn, rows)
+    db.player_cache.clear()
+    _PLAYER_MISSES.clear()
+    saved = db.select_players(conn, players)
+    return [saved[gdid] for gdid in map(str, players) if gdid in saved]
+
+
+def _stat_rows(type, player_id, year):
+    """Fetches a player's stat rows for a season, or None if the request failed."""
+    json = get_json(M_URL_PRE + M_STAT_FMT.format(type, player_id, year))
+    if not json:
+        # Failed request or empty body; never mistake it for "no stats"
+        return None
+    idx_composed = 'sport_{}_composed'.format(type)
+    idx_agg = 'sport_{}_agg'.format(type)
+    data = json[idx_composed][idx_agg]['queryResults']
+    rows = data.get('row', [])
+    if isinstance(rows, dict):
+        rows = [rows]
+    return rows
 
 
 def get_player_stats(type='hitting',
@@ -324,36 +425,215 @@ def get_player_stats(type='hitting',
     Returns:
         Dictionary of form {"stat_abbrev":"value"} with the stats.
     """
-    url = M_URL_PRE + M_STAT_FMT.format(type, player_id, year)
-    json = get_json(url)
-    if json is None:
-        return {}
-    idx_composed = 'sport_{}_composed'.format(type)
-    idx_agg = 'sport_{}_agg'.format(type)
-    data = json[idx_composed][idx_agg]['queryResults']
-    if data['totalSize'] is '1':  # TODO multi year in one request
-        return data['row']
+    return _single_row(_stat_rows(type, player_id, year))
+
+
+def _single_row(rows):
+    # Single season dict API; see get_players_stats for multi-row results
+    if rows is not None and len(rows) == 1:
+        return rows[0]
     return {}
 
 
+def get_players_stats(player_ids, seasons, type='hitting', workers=STAT_WORKERS):
+    """Gets stats for many players and seasons concurrently.
+
+    Requests run on a thread pool and share the transport's rate limit.
+    Args:
+        player_ids: Iterable of player gameday ids.
+        seasons: Iterable of seasons.
+        type: String type of stats (hitting or pitching).
+        workers: Number of concurrent requests.
+    Returns:
+        List of stat dicts, one per returned row, each with player_id,
+        season and type keys added. Players without stats for a season
+        have no rows.
+    """
+    player_ids = list(player_ids)
+    seasons = list(seasons)
+    jobs = [(player_id, season) for player_id in player_ids for season in seasons]
+
+    def _fetch(job):
+        player_id, season = job
+        return [dict(row, player_id=str(player_id), season=int(season), type=type)
+                for row in _stat_rows(type, player_id, season) or []]
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for job_rows in pool.map(_fetch, jobs):
+            rows.extend(job_rows)
+    return rows
+
+
+def _season_final(year):
+    return int(year) < datetime.date.today().year
+
+
+def _store_stats(rows):
+    db.prepare()
+    conn = db.connection()
+    with conn:
+        db.upsert_stats(conn, rows)
+
+
+def stored_player_stats(type, player_id, year):
+    """Gets a player's season stat rows through the local stat store.
+
+    Past seasons are fetched once and kept; the current season is refetched
+    when its stored copy is older than STATS_REFRESH_INTERVAL. Failed
+    requests are never stored.
+    Args:
+        type: String type of stats (hitting or pitching).
+        player_id: Gameday id of the player.
+        year: Season to get stats from.
+    Returns:
+        List of stat dicts as returned by the lookup service (more than one
+        for multi-row results, empty if the player has no stats), or None
+        if they aren't stored and couldn't be fetched.
+    """
+    stored = db.find_stats(player_id, year, type)
+    if stored is not None:
+        rows, final, fetched = stored
+        if final or time.time() - fetched < STATS_REFRESH_INTERVAL:
+            return rows
+    rows = _stat_rows(type, player_id, year)
+    if rows is None:
+        return stored[0] if stored is not None else None
+    _store_stats([(player_id, year, type, rows, _season_final(year))])
+    return rows
+
+
+def refresh_player_stats(year=None, types=('hitting', 'pitching'), workers=STAT_WORKERS):
+    """Refetches stale current-season stats in the local stat store.
+
+    Meant to be run on a schedule so by-name lookups are served from the
+    store. Only rows older than STATS_REFRESH_INTERVAL are refetched, and
+    rows whose season has ended are marked final and never refetched again.
+    Args:
+        year: Season to refresh, default the current one.
+        types: Stat types to refresh.
+        workers: Number of concurrent requests.
+    Returns:
+        Number of refreshed player seasons.
+    """
+    if year is None:
+        year = datetime.date.today().year
+    before = time.time() - STATS_REFRESH_INTERVAL
+    stale = [(type_, gdid) for type_ in types for gdid in db.stale_stats(year, type_, before)]
+
+    def _fetch(request):
+        type_, gdid = request
+        return type_, gdid, _stat_rows(type_, gdid, year)
+
+    refreshed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for type_, gdid, rows in pool.map(_fetch, stale):
+            if rows is not None:
+                refreshed.append((gdid, year, type_, rows, _season_final(year)))
+    if refreshed:
+        _store_stats(refreshed)
+    return len(refreshed)
+
+
+class _RosterRefresh(object):
+    """Today's roster refresh run on lookup misses.
+
+    Concurrent callers share a single in-flight refresh, and a refresh is
+    skipped if one finished less than `interval` seconds ago.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._last = None
+        self._running = False
+        self._generation = 0
+        self._cond = threading.Condition()
+
+    def run(self):
+        with self._cond:
+            if self._running:
+                generation = self._generation
+                while self._running and self._generation == generation:
+                    self._cond.wait()
+                return
+            if self._last is not None and time.monotonic() - self._last < self.interval:
+                LOG.debug("Rosters refreshed recently; skipping refresh.")
+                return
+            self._running = True
+        try:
+            LOG.warning("Player not in database. Updating gameday ids and retrying.")
+            tdy = datetime.datetime.today()
+            update_gameday_ids(tdy.year, tdy.month, tdy.day)
+        finally:
+            with self._cond:
+                self._running = False
+                self._last = time.monotonic()
+                self._generation += 1
+                self._cond.notify_all()
+
+
+class _MissCache(object):
+    """Lookup keys known to be missing from the database, with a TTL."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._misses = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            expires = self._misses.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._misses[key]
+                return False
+            return True
+
+    def add(self, key):
+        with self._lock:
+            self._misses[key] = time.monotonic() + self.ttl
+
+    def clear(self):
+        with self._lock:
+            self._misses.clear()
+
+
+_ROSTER_REFRESH = _RosterRefresh(ROSTER_REFRESH_INTERVAL)
+_PLAYER_MISSES = _MissCache(PLAYER_MISS_TTL)
+
+
+def _find_player(miss_key, **query):
+    if miss_key in _PLAYER_MISSES:
+        LOG.debug("Player %s recently not found; skipping lookup.", miss_key[1])
+        return None
+    player = db.find_player(**query)
+    if not player:
+        _ROSTER_REFRESH.run()
+        player = db.find_player(**query)
+        if not player:
+            _PLAYER_MISSES.add(miss_key)
+            LOG.error("Player not in database.")
+            return None
+    return player
+
+
 def get_player_by_name(first, last):
     """Gets a player from the database.
+
+    Names are matched ignoring case, accents and punctuation. A miss
+    triggers a refresh of today's rosters (at most once per
+    ROSTER_REFRESH_INTERVAL), and names still missing afterwards aren't
+    looked up again for PLAYER_MISS_TTL seconds.
     Args:
         first: The player's first name.
         last: The player's last name (Scott Van Slyke -> last="Van Slyke")
     Returns:
         The Player, or None if player isn't in the database.
     """
-    player = db.Player.get_one(firstname=first, lastname=last)
-    if not player:
-        LOG.warning(
-            "Player not in database. Updating gameday ids and retrying.")
-        tdy = datetime.datetime.today()
-        update_gameday_ids(tdy.year, tdy.month, tdy.day)
-        player = db.Player.get_one(firstname=first, lastname=last)
-        if not player:
-            LOG.error("Player not in database.")
-            return None
+    player = _find_player(('name', db.name_key(first, last)), first=first, last=last)
+    if player is None:
+        return None
     LOG.info("Retrieved player: %s",
              ' '.join([player.firstname, player.lastname]))
     return player
@@ -361,22 +641,14 @@ def get_player_by_name(first, last):
 
 def get_player_by_id(player_id):
     """Gets a player from the database.
+
+    Misses are handled as in get_player_by_name.
     Args:
         player_id: The player's id.
     Returns:
         The Player, or None if player isn't in the database.
     """
-    player = db.Player.get_one(gdid=player_id)
-    if not player:
-        LOG.warning(
-            "Player not in database. Updating gameday ids and retrying.")
-        tdy = datetime.datetime.today()
-        update_gameday_ids(tdy.year, tdy.month, tdy.day)
-        player = db.Player.get_one(gdid=player_id)
-        if not player:
-            LOG.error("Player not in database.")
-            return None
-    return player
+    return _find_player(('gdid', str(player_id)), gdid=player_id)
 
 
 def get_player_stats_by_name(first, last, year):
@@ -391,9 +663,9 @@ def get_player_stats_by_name(first, last, year):
     player = get_player_by_name(first, last)
     if player is None:
         return {}
-    if player.position is 'P':
-        return get_player_stats('pitching', player.gdid, year)
-    return get_player_stats('hitting', player.gdid, year)
+    if player.position == 'P':
+        return _single_row(stored_player_stats('pitching', player.gdid, year))
+    return _single_row(stored_player_stats('hitting', player.gdid, year))
 
 
 def get_pitching_stats_by_name(first, last, year,
@@ -410,7 +682,7 @@ def get_pitching_stats_by_name(first, last, year,
     player = get_player_by_name(first, last)
     if player is None:
         return {}
-    player_stats = get_player_stats('pitching', player.gdid, year)
+    player_stats = _single_row(stored_player_stats('pitching', player.gdid, year))
     if not stats:
         stats = []
     stats_lower = [s.lower() for s in stats]
@@ -435,7 +707,7 @@ def get_batting_stats_by_name(first, last, year,
     player = get_player_by_name(first, last)
     if player is None:
         return {}
-    player_stats = get_player_stats('hitting', player.gdid, year)
+    player_stats = _single_row(stored_player_stats('hitting', player.gdid, year))
     if not stats:
         stats = []
     stats_lower = [s.lower() for s in stats]
@@ -451,15 +723,148 @@ def _build_gameday_url(game_id, *args):
     return '/'.join((GD_URL_PRE, date_path, 'gid_' + game_id, '/'.join(args)))
 
 
-def innings_all(game_id):
+def innings_all(game_id, lazy=False):
+    """Gets a game's inning_all.xml as an inning.Game.
+
+    With the object cache enabled (see pygd2.objcache) the parsed game is
+    loaded from disk when its source hasn't changed; cached games are
+    always fully built.
+    Args:
+        game_id: Gameday id of the game.
+        lazy: Build innings, at-bats and pitches only when accessed.
+    Returns:
+        inning.Game
+    """
+    url = _build_gameday_url(game_id, 'inning', 'inning_all.xml')
+    objects = objcache.get_cache()
+    if objects is not None:
+        return objects.load('inning_all', game_id, url,
+                            lambda body: inning.Game.from_etree(ElementTree.fromstring(body)))
+    xml = get_xml(url)
+    return inning.Game.from_etree(xml, lazy)
+
+
+def iter_innings_all(game_id):
+    """Streams a game's inning_all.xml, yielding at-bats as they are parsed.
+    Args:
+        game_id: Gameday id of the game.
+    Yields:
+        Tuples of (inning.Inning, top, inning.AtBat); see inning.iter_atbats.
+    """
+    url = _build_gameday_url(game_id, 'inning', 'inning_all.xml')
+    LOG.debug("Request to xml URL: %s", url)
+    response = transport.get(url, stream=True)
+    if response.status_code != requests.codes.ok:
+        LOG.error("Request to %s: status %s", url, response.status_code)
+        response.close()
+        return
+    raw = response.raw
+    if hasattr(raw, 'decode_content'):
+        raw.decode_content = True
+    try:
+        for item in inning.iter_atbats(raw):
+            yield item
+    finally:
+        response.close()
+
+
+class InningsTracker(object):
+    """Follows an in-progress game inning by inning.
+
+    Each update() refetches only the last known inning_N.xml and any innings
+    after it, skips parsing files whose body hasn't changed, and rebuilds
+    only at-bats that are new or were in progress; earlier innings are kept
+    as they were. Use it instead of calling innings_all() repeatedly.
+    Game level attributes (atBat, deck, hole, ind) only come with
+    inning_all.xml and stay None.
+    Args:
+        game_id: Gameday id of the game.
+    """
+
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.game = inning.Game()
+        self.game.innings = ()
+        self._digests = {}
+
+    def _fetch(self, num):
+        """Gets the inning_N.xml body, or None if it doesn't exist."""
+        url = _build_gameday_url(self.game_id, 'inning', 'inning_%d.xml' % num)
+        response = transport.get(url)
+        if response.status_code != requests.codes.ok:
+            LOG.debug("Request to %s: status %s", url, response.status_code)
+            return None
+        return response.content
+
+    def update(self):
+        """Brings the game up to date.
+        Returns:
+            List of inning.AtBat that are new or were rebuilt.
+        """
+        innings = list(self.game.innings)
+        num = max(len(innings), 1)
+        changed = []
+        while True:
+            previous = innings[num - 1] if num <= len(innings) else None
+            body = self._fetch(num)
+            if body is None:
+                break
+            digest = hashlib.sha256(body).digest()
+            if previous is not None and self._digests.get(num) == digest:
+                current = previous
+            else:
+                current = inning.Inning.from_etree(ElementTree.fromstring(body), previous)
+                kept = {id(atbat) for atbat in previous.atbats} if previous is not None else set()
+                changed.extend(atbat for atbat in current.atbats if id(atbat) not in kept)
+                if previous is None:
+                    innings.append(current)
+                else:
+                    innings[num - 1] = current
+                self._digests[num] = digest
+            if current.next != 'Y':
+                break
+            num += 1
+        self.game.innings = tuple(innings)
+        return changed
+
+
+def pitch_table(game_id):
+    """Gets a game's pitches as a columnar table.
+    Args:
+        game_id: Gameday id of the game.
+    Returns:
+        table.PitchTable built from the game's inning_all.xml, or None.
+    """
     url = _build_gameday_url(game_id, 'inning', 'inning_all.xml')
     xml = get_xml(url)
-    return inning.Game.from_etree(xml)
+    if xml is None:
+        return None
+    return table.PitchTable.from_etree(xml, game_id)
+
+
+def pitch_tables(game_ids):
+    """Gets the pitches of many games as one columnar table.
+    Args:
+        game_ids: Iterable of gameday ids.
+    Returns:
+        table.PitchTable with every pitch of the games that could be fetched.
+    """
+    tables = (pitch_table(game_id) for game_id in game_ids)
+    return table.concat(tbl for tbl in tables if tbl is not None)
 
 
 def game_feed(game_pk):
+    """Gets a game's exit velocity rows from Baseball Savant.
+    Args:
+        game_pk: game_pk of the game.
+    Returns:
+        List of gamefeed.ExitVelocity, or None if the request failed.
+    """
     url = "https://baseballsavant.mlb.com/gf?game_pk=%s" % game_pk
-    data = get_json(url)['exit_velocity']
+    data = get_json(url)
+    if not data:
+        return None
+    data = data.get('exit_velocity', [])
     out = []
     for mapping in data:
         out.append(gamefeed.ExitVelocity(**mapping))
@@ -471,6 +876,16 @@ class MLBInfo(object):
     def __init__(self, al_info, nl_info):
         self.national = nl_info
         self.american = al_info
+        self.teams = {}
+        for league in (al_info, nl_info):
+            for division in league.divisions.values():
+                for team in division.teams.values():
+                    for key in team.keys():
+                        self.teams.setdefault(key, team)
+
+    def team(self, key):
+        """Gets a team by name, code, file code, gameday id or alias, or None."""
+        return self.teams.get(str(key).lower())
 
 
 class LeagueInfo(object):
@@ -488,6 +903,10 @@ class DivisionInfo(object):
         self.gdid = id
         self.teams = teams
 
+    def __setstate__(self, state):
+        # Loaded from mlb.yml, which names the gameday id 'id'
+        self.__init__(**state)
+
 
 class TeamInfo(object):
 
@@ -501,11 +920,29 @@ class TeamInfo(object):
         self.gdid = id
         self.names = names
 
+    def __setstate__(self, state):
+        # Loaded from mlb.yml, which names the gameday id 'id'
+        self.__init__(**state)
+
+    def keys(self):
+        """Lowercase keys the team can be looked up by."""
+        keys = [self.name, self.code, self.file_code, self.gdid] + list(self.names or [])
+        return [str(key).lower() for key in keys if key is not None]
+
+
+_MLB_INFO = None
+_MLB_INFO_LOCK = threading.Lock()
+
 
 def mlb_info():
-    with open(os.path.join(os.path.dirname(__file__), '../contrib/mlb.yml')) as mlbfp:
-        mlb = yaml.load(mlbfp.read())
-    return MLBInfo(mlb['AL'], mlb['NL'])
+    """Gets the league, division and team metadata, loaded once per process."""
+    global _MLB_INFO
+    with _MLB_INFO_LOCK:
+        if _MLB_INFO is None:
+            with open(os.path.join(os.path.dirname(__file__), '../contrib/mlb.yml')) as mlbfp:
+                mlb = yaml.load(mlbfp.read(), Loader=yaml.Loader)
+            _MLB_INFO = MLBInfo(mlb['AL'], mlb['NL'])
+        return _MLB_INFO
 
 
 def league_info(league):
@@ -531,10 +968,14 @@ def division_info(league, division):
 
 
 def team_info(team_name):
-    mlb = mlb_info()
-    for league in [mlb.american, mlb.national]:
-        for division in league.divisions.values():
-            for team in division.teams.values():
-                if team_name.lower() == team.name.lower():
-                    return team
-    raise ValueError("Team %s not found." % team_name)
+    """Gets a team's metadata.
+    Args:
+        team_name: Team name, code, file code, gameday id or any alias in
+            its names (case insensitive).
+    Returns:
+        TeamInfo
+    """
+    team = mlb_info().team(team_name)
+    if team is None:
+        raise ValueError("Team %s not found." % team_name)
+    return team
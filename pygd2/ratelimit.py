@@ -0,0 +1,98 @@
+"""Per-host token bucket rate limiting.
+
+Buckets are shared by every thread and asyncio task in the process. Taking a
+token reserves a slot under a lock and returns how long the caller must wait,
+so threads sleep with time.sleep and tasks await asyncio.sleep on the same
+bucket without blocking each other.
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Default sustained requests per second and burst size per host
+RATE = 2.0
+BURST = 4
+
+
+class TokenBucket(object):
+    """Token bucket refilled at rate tokens/second up to burst tokens.
+
+    Args:
+        rate: Sustained requests per second.
+        burst: Maximum number of requests allowed back to back.
+    """
+
+    def __init__(self, rate=RATE, burst=BURST):
+        if rate <= 0:
+            raise ValueError("rate must be positive, got %s" % rate)
+        if burst < 1:
+            raise ValueError("burst must be at least 1, got %s" % burst)
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token, going into debt if none are available.
+        Returns:
+            Seconds the caller must wait before sending its request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Blocks the calling thread until a token is available."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Waits in the event loop until a token is available."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RateLimiter(object):
+    """Keeps one TokenBucket per host.
+
+    Args:
+        rate: Default requests per second for hosts without an override.
+        burst: Default burst for hosts without an override.
+        hosts: Mapping of host name to (rate, burst) overrides.
+    """
+
+    def __init__(self, rate=RATE, burst=BURST, hosts=None):
+        self.rate = rate
+        self.burst = burst
+        self.hosts = dict(hosts or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        """Gets the TokenBucket for the host of a URL."""
+        host = urlsplit(url).hostname or ''
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.hosts.get(host, (self.rate, self.burst))
+                bucket = TokenBucket(rate, burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url):
+        """Blocks until a request to url is allowed."""
+        self.bucket(url).acquire()
+
+    async def acquire_async(self, url):
+        """Waits in the event loop until a request to url is allowed."""
+        await self.bucket(url).acquire_async()
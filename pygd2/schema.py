@@ -0,0 +1,64 @@
+"""Schema-driven attribute conversion.
+
+A schema maps field names to a type (int, float, str). compile() turns it
+into a converter that coerces a whole attribute mapping in one pass with a
+per-field lookup, instead of trying json.loads on every value. Empty or
+malformed values become None; fields missing from the schema are passed
+through unchanged.
+"""
+
+
+def _int(value):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+
+
+def _float(value):
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _str(value):
+    if value is None:
+        return None
+    return str(value)
+
+
+def _raw(value):
+    return value
+
+
+CONVERTERS = {
+    int: _int,
+    float: _float,
+    str: _str,
+}
+
+
+def compile(schema):  # pylint: disable=redefined-builtin
+    """Compiles a schema into a converter function.
+    Args:
+        schema: Mapping of field name to int, float, str or a callable.
+    Returns:
+        Function taking an attribute mapping and returning a new dict with
+        every known field converted.
+    """
+    converters = {field: CONVERTERS.get(kind, kind) for field, kind in schema.items()}
+    get = converters.get
+
+    def convert(mapping):
+        return {key: get(key, _raw)(val) for key, val in mapping.items()}
+
+    convert.schema = dict(schema)
+    return convert
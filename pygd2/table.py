@@ -0,0 +1,245 @@
+"""Columnar pitch tables.
+
+PitchTable holds every pitch of one or more games as a NumPy structured
+array with fixed dtypes, built straight from inning_all.xml attributes
+without creating Pitch objects; tfs_zulu is stored as int64 epoch seconds.
+String fields with few distinct values (pitch type, result type,
+handedness, game id) are dictionary encoded: the column holds integer codes
+(int32 for game ids, which grow across seasons, int16 otherwise) into
+PitchTable.categories, with -1 for missing. Missing floats are NaN and
+missing ints are -1.
+
+Requires numpy (pip install pygd2[table]); to_arrow() also needs pyarrow.
+"""
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from pygd2 import inning
+from pygd2 import timestamps
+
+# At-bat context copied onto each pitch row: (column, dtype)
+ATBAT_FIELDS = (
+    ('inning', 'i2'),
+    ('top', '?'),
+    ('ab_num', 'i2'),
+    ('batter', 'i4'),
+    ('pitcher', 'i4'),
+)
+
+# Pitch attributes stored as numbers: (column, dtype)
+PITCH_FIELDS = (
+    ('id', 'i2'),
+    ('event_num', 'i2'),
+    ('x', 'f4'),
+    ('y', 'f4'),
+    ('start_speed', 'f4'),
+    ('end_speed', 'f4'),
+    ('sz_top', 'f4'),
+    ('sz_bot', 'f4'),
+    ('pfx_x', 'f4'),
+    ('pfx_z', 'f4'),
+    ('px', 'f4'),
+    ('pz', 'f4'),
+    ('x0', 'f4'),
+    ('y0', 'f4'),
+    ('z0', 'f4'),
+    ('vx0', 'f4'),
+    ('vy0', 'f4'),
+    ('vz0', 'f4'),
+    ('ax', 'f4'),
+    ('ay', 'f4'),
+    ('az', 'f4'),
+    ('break_y', 'f4'),
+    ('break_angle', 'f4'),
+    ('break_length', 'f4'),
+    ('type_confidence', 'f4'),
+    ('zone', 'i2'),
+    ('nasty', 'i2'),
+    ('spin_dir', 'f4'),
+    ('spin_rate', 'f4'),
+)
+
+# Pitch tfs_zulu as epoch seconds
+TIME_FIELDS = (
+    ('tfs_zulu', 'i8'),
+)
+
+# Dictionary encoded columns and their code dtypes; game ids run past
+# int16 in archives spanning many seasons
+CATEGORY_FIELDS = (
+    ('game', 'i4'),
+    ('stand', 'i2'),
+    ('p_throws', 'i2'),
+    ('type', 'i2'),
+    ('pitch_type', 'i2'),
+)
+CATEGORY_NAMES = tuple(name for name, _ in CATEGORY_FIELDS)
+
+DTYPE = (list(ATBAT_FIELDS) + list(PITCH_FIELDS) + list(TIME_FIELDS) +
+         list(CATEGORY_FIELDS))
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("pygd2.table requires numpy (pip install pygd2[table])")
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return -1
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _code(codes, value):
+    if not value:
+        return -1
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(codes)
+    return code
+
+
+class _Builder(object):
+    """Accumulates pitch rows as Python tuples before the array is built."""
+
+    def __init__(self, game_id):
+        self.rows = []
+        self.codes = {name: {} for name in CATEGORY_NAMES}
+        self.game_code = _code(self.codes['game'], game_id)
+
+    def add_atbat(self, inning_num, top, c_ab):
+        attrib = c_ab.attrib
+        context = (inning_num, top, _int(attrib.get('num')), _int(attrib.get('batter')),
+                   _int(attrib.get('pitcher')))
+        stand = _code(self.codes['stand'], attrib.get('stand'))
+        p_throws = _code(self.codes['p_throws'], attrib.get('p_throws'))
+        types = self.codes['type']
+        pitch_types = self.codes['pitch_type']
+        for c_pitch in c_ab:
+            if c_pitch.tag != 'pitch':
+                continue
+            pattrib = c_pitch.attrib
+            values = tuple(_int(pattrib.get(name)) if dtype[0] == 'i' else _float(pattrib.get(name))
+                           for name, dtype in PITCH_FIELDS)
+            tfs_zulu = timestamps.zulu_epoch(pattrib.get('tfs_zulu'))
+            self.rows.append(context + values + (
+                -1 if tfs_zulu is None else tfs_zulu,
+                self.game_code, stand, p_throws,
+                _code(types, pattrib.get('type')),
+                _code(pitch_types, pattrib.get('pitch_type'))))
+
+    def build(self):
+        data = numpy.array(self.rows, dtype=DTYPE)
+        categories = {name: tuple(sorted(codes, key=codes.get))
+                      for name, codes in self.codes.items()}
+        return PitchTable(data, categories)
+
+
+class PitchTable(object):
+    """Pitches as a NumPy structured array plus category labels.
+
+    Args:
+        data: Structured array with dtype DTYPE.
+        categories: Mapping of dictionary encoded column to its labels.
+    """
+
+    def __init__(self, data, categories):
+        self.data = data
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+    @property
+    def columns(self):
+        return self.data.dtype.names
+
+    def labels(self, name):
+        """Decodes a dictionary encoded column to an object array of labels."""
+        lookup = numpy.array(self.categories[name] + (None,), dtype=object)
+        return lookup[self.data[name]]
+
+    @classmethod
+    def from_etree(cls, root, game_id=None):
+        """Builds a table from a parsed inning_all.xml root element."""
+        _require_numpy()
+        builder = _Builder(game_id)
+        for c_inn in root:
+            inning_num = _int(c_inn.get('num'))
+            for c_half in c_inn:
+                top = c_half.tag == 'top'
+                for c_ab in c_half:
+                    if c_ab.tag == 'atbat':
+                        builder.add_atbat(inning_num, top, c_ab)
+        return builder.build()
+
+    @classmethod
+    def from_source(cls, source, game_id=None):
+        """Builds a table by incrementally parsing an inning_all.xml file.
+        Args:
+            source: Filename or binary file object.
+            game_id: Gameday id recorded in the game column.
+        """
+        _require_numpy()
+        builder = _Builder(game_id)
+        for inning_attrib, top, c_ab in inning.iter_atbat_elements(source):
+            builder.add_atbat(_int(inning_attrib.get('num')), top, c_ab)
+        return builder.build()
+
+    def to_arrow(self):
+        """Converts the table to a pyarrow.RecordBatch.
+
+        Dictionary encoded columns become pyarrow DictionaryArrays.
+        """
+        import pyarrow
+        arrays = []
+        for name in self.columns:
+            column = self.data[name]
+            if name in self.categories:
+                indices = pyarrow.array(column, mask=column < 0)
+                dictionary = pyarrow.array(self.categories[name], type=pyarrow.string())
+                arrays.append(pyarrow.DictionaryArray.from_arrays(indices, dictionary))
+            else:
+                arrays.append(pyarrow.array(column))
+        return pyarrow.RecordBatch.from_arrays(arrays, names=list(self.columns))
+
+
+def concat(tables):
+    """Concatenates PitchTables, merging their category labels.
+    Args:
+        tables: Iterable of PitchTable.
+    Returns:
+        A PitchTable with every row.
+    """
+    _require_numpy()
+    tables = list(tables)
+    categories = {name: {} for name in CATEGORY_NAMES}
+    parts = []
+    for table in tables:
+        data = table.data.copy()
+        for name in CATEGORY_NAMES:
+            labels = categories[name]
+            remap = numpy.array([_code(labels, label) for label in table.categories[name]] + [-1],
+                                dtype=dict(CATEGORY_FIELDS)[name])
+            data[name] = remap[data[name]]
+        parts.append(data)
+    data = numpy.concatenate(parts) if parts else numpy.empty(0, dtype=DTYPE)
+    return PitchTable(data, {name: tuple(sorted(labels, key=labels.get))
+                             for name, labels in categories.items()})
@@ -0,0 +1,125 @@
+"""Fast decoding of gameday tfs / tfs_zulu timestamps.
+
+Gameday timestamps have fixed formats (tfs "HHMMSS", tfs_zulu
+"YYYY-MM-DDTHH:MM:SSZ"), so they are decoded by slicing instead of
+datetime.strptime, with the UTC tzinfo shared. Malformed values fall back to
+strptime so errors read the same as before.
+"""
+
+import calendar
+import datetime
+
+import pytz
+
+TFS_FMT = "%H%M%S"
+ZULU_FMT = "%Y-%m-%dT%H:%M:%SZ"
+
+_UTC = pytz.utc
+
+
+class _Unset(object):
+    """Cache slot value for a timestamp that hasn't been decoded yet."""
+
+    def __repr__(self):
+        return 'UNSET'
+
+    def __reduce__(self):
+        # Unpickle to the module singleton so identity checks keep working
+        return 'UNSET'
+
+
+UNSET = _Unset()
+
+
+def parse_tfs(raw):
+    """Decodes an HHMMSS tfs value to a UTC datetime.time, or None if empty."""
+    if raw is None or raw == '':
+        return None
+    raw = str(raw).rjust(6, '0')
+    try:
+        return datetime.time(int(raw[0:2]), int(raw[2:4]), int(raw[4:6]), tzinfo=_UTC)
+    except ValueError:
+        return _UTC.localize(datetime.datetime.strptime(raw, TFS_FMT)).timetz()
+
+
+def parse_zulu(raw):
+    """Decodes a tfs_zulu value to a UTC datetime, or None if empty."""
+    if not raw:
+        return None
+    try:
+        return datetime.datetime(int(raw[0:4]), int(raw[5:7]), int(raw[8:10]),
+                                 int(raw[11:13]), int(raw[14:16]), int(raw[17:19]),
+                                 tzinfo=_UTC)
+    except ValueError:
+        return _UTC.localize(datetime.datetime.strptime(raw, ZULU_FMT))
+
+
+def epoch(value):
+    """Converts a decoded tfs_zulu datetime to integer epoch seconds, or None."""
+    if value is None:
+        return None
+    return calendar.timegm(value.utctimetuple())
+
+
+def zulu_epoch(raw):
+    """Decodes a tfs_zulu value to integer seconds since the epoch, or None."""
+    if not raw:
+        return None
+    try:
+        return calendar.timegm((int(raw[0:4]), int(raw[5:7]), int(raw[8:10]),
+                                int(raw[11:13]), int(raw[14:16]), int(raw[17:19])))
+    except ValueError:
+        return calendar.timegm(datetime.datetime.strptime(raw, ZULU_FMT).timetuple())
+
+
+class LazyTimestamp(object):
+    """Descriptor that decodes a raw timestamp slot on first access.
+
+    The raw string is kept in raw_slot and the decoded value is cached in
+    cache_slot, which owners initialize to UNSET. Assigning to the attribute
+    stores a decoded value directly.
+    Args:
+        raw_slot: Name of the slot holding the raw string.
+        cache_slot: Name of the slot caching the decoded value.
+        parse: Function decoding the raw string.
+    """
+
+    def __init__(self, raw_slot, cache_slot, parse):
+        self.raw_slot = raw_slot
+        self.cache_slot = cache_slot
+        self.parse = parse
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.cache_slot)
+        if value is UNSET:
+            value = self.parse(getattr(obj, self.raw_slot))
+            setattr(obj, self.cache_slot, value)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.cache_slot, value)
+
+
+class LazyEpoch(object):
+    """Read-only descriptor giving a tfs_zulu slot as integer epoch seconds.
+
+    Uses the decoded datetime if a LazyTimestamp already cached one, and
+    otherwise decodes the raw string without building a datetime.
+    Args:
+        raw_slot: Name of the slot holding the raw tfs_zulu string.
+        cache_slot: Name of the LazyTimestamp cache slot.
+    """
+
+    def __init__(self, raw_slot, cache_slot):
+        self.raw_slot = raw_slot
+        self.cache_slot = cache_slot
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.cache_slot)
+        if value is UNSET:
+            return zulu_epoch(getattr(obj, self.raw_slot))
+        return epoch(value)
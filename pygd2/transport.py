@@ -0,0 +1,159 @@
+"""Shared HTTP transport for PyGD2.
+
+All fetches go through a single pooled requests.Session so connections to
+gd2.mlb.com, statsapi and friends are kept alive and reused across calls.
+"""
+
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pygd2 import cache as response_cache
+from pygd2 import ratelimit
+
+LOG = logging.getLogger(__name__)
+
+# Connection pool defaults; pool_maxsize is the per-host connection limit
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+
+# (connect, read) timeout in seconds
+TIMEOUT = (5, 30)
+
+# Retry GETs on connection errors and these statuses with exponential backoff
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Default for arguments where None has a meaning of its own
+_DEFAULT = object()
+
+
+class Transport(object):
+    """Pooled HTTP session with timeouts and retries.
+
+    Args:
+        pool_connections: Number of host pools to keep.
+        pool_maxsize: Max connections kept open per host.
+        timeout: Seconds, or (connect, read) tuple, applied to every request.
+        retries: Retries for connection errors and 5xx responses.
+        backoff_factor: Backoff factor between retries (0.5 -> 0.5s, 1s, 2s...).
+        retry_statuses: Response statuses that trigger a retry.
+        headers: Extra headers sent with every request.
+        limiter: RateLimiter applied before each request (a default
+            RateLimiter if omitted); None disables rate limiting.
+        cache: ResponseCache for GETs. None uses PYGD2_HTTP_CACHE if it is
+            set; False disables caching.
+    """
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 timeout=TIMEOUT, retries=RETRIES, backoff_factor=BACKOFF_FACTOR,
+                 retry_statuses=RETRY_STATUSES, headers=None, limiter=_DEFAULT, cache=None):
+        self.timeout = timeout
+        self.limiter = ratelimit.RateLimiter() if limiter is _DEFAULT else limiter
+        self.cache = response_cache.from_env() if cache is None else cache
+        retry = Retry(total=retries,
+                      backoff_factor=backoff_factor,
+                      status_forcelist=retry_statuses,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              max_retries=retry,
+                              pool_block=True)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, url, **kwds):
+        """Sends a GET request through the pooled session.
+
+        With a cache, fresh entries are served without touching the network
+        and stale ones are revalidated with a conditional GET. Streamed
+        requests are served from fresh cache entries but never stored.
+        Args:
+            url: URL to request.
+            kwds: Extra keyword arguments for requests.Session.get.
+        Returns:
+            The requests.Response, or a cache.CachedResponse.
+        """
+        kwds.setdefault('timeout', self.timeout)
+        if not self.cache:
+            return self._send(url, **kwds)
+        entry = self.cache.lookup(url)
+        if entry is not None and entry.fresh:
+            cached = self.cache.response(entry)
+            if cached is not None:
+                self.cache.hits += 1
+                return cached
+            entry = None
+        if kwds.get('stream'):
+            # Streamed bodies are consumed by the caller and never stored
+            return self._send(url, **kwds)
+        if entry is not None:
+            headers = dict(kwds.pop('headers', None) or {})
+            headers.update(entry.validators())
+            kwds['headers'] = headers
+        response = self._send(url, **kwds)
+        if response.status_code == 304 and entry is not None:
+            cached = self.cache.response(entry, not_modified=True)
+            if cached is not None:
+                self.cache.refresh(entry)
+                self.cache.revalidated += 1
+                return cached
+        self.cache.misses += 1
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    def _send(self, url, **kwds):
+        if self.limiter:
+            self.limiter.acquire(url)
+        response = self.session.get(url, **kwds)
+        response.from_cache = False
+        response.not_modified = False
+        return response
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+
+_TRANSPORT = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_transport():
+    """Gets the shared Transport, creating it with defaults on first use."""
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            _TRANSPORT = Transport()
+        return _TRANSPORT
+
+
+def configure(**kwds):
+    """Replaces the shared Transport with one built from kwds.
+
+    Settings left out get their defaults, not the previous Transport's.
+    Args:
+        kwds: Keyword arguments for Transport.
+    Returns:
+        The new shared Transport.
+    """
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is not None:
+            _TRANSPORT.close()
+        _TRANSPORT = Transport(**kwds)
+        return _TRANSPORT
+
+
+def get(url, **kwds):
+    """Sends a GET request through the shared Transport."""
+    return get_transport().get(url, **kwds)
@@ -0,0 +1,272 @@
+"""Partitioned Parquet warehouse of pitches, at-bats and exit velocities.
+
+Each finished game is written once per dataset as a Hive-partitioned
+Parquet file:
+
+    root/pitches/season=2017/month=6/game_id=2017_06_18_lanmlb_cinmlb_1/part-v1.parquet
+
+Files are never rewritten, except when SCHEMA_VERSION changes, and exported
+games are recorded in an append-only manifest so reruns only add new games.
+The schema version is stored in each file's metadata and in its name, and
+readers only see files of the current version. Games are exported only once
+they are FINAL_AFTER_DAYS old, so in-progress games aren't frozen.
+
+    warehouse = pygd2.warehouse.Warehouse('warehouse')
+    warehouse.export(datetime.date(2017, 4, 2), datetime.date(2017, 10, 1))
+    pitches = warehouse.dataset('pitches').to_table()
+
+Requires pyarrow and numpy (pip install pygd2[arrow]).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import glob
+import logging
+import os
+
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+from pygd2 import cache as response_cache
+from pygd2 import crawl
+from pygd2 import gamefeed
+from pygd2 import inning
+from pygd2 import pygd2
+from pygd2 import table
+from pygd2 import timestamps
+
+LOG = logging.getLogger(__name__)
+
+# Bump when a dataset's columns change; older files are replaced on export
+SCHEMA_VERSION = 1
+
+DATASETS = ('pitches', 'atbats', 'exit_velocity')
+
+MANIFEST_NAME = '_manifest.jsonl'
+
+# Default worker threads; the shared rate limiter still paces requests
+WORKERS = 8
+
+_ARROW_TYPES = {
+    int: 'int32',
+    float: 'float64',
+    str: 'string',
+    bool: 'bool',
+    'epoch': 'int64',
+}
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError("pygd2.warehouse requires pyarrow (pip install pygd2[arrow])")
+
+
+def _arrow_schema(fields):
+    return pyarrow.schema([(name, _ARROW_TYPES[kind]) for name, kind in fields])
+
+
+def _atbat_fields():
+    fields = [('inning', int), ('top', bool)]
+    for name, kind in sorted(inning.ATBAT_SCHEMA.items()):
+        if name == 'start_tfs_zulu':
+            fields.append((name, 'epoch'))
+        else:
+            fields.append((name, kind))
+    return fields
+
+
+ATBAT_FIELDS = _atbat_fields()
+EXIT_VELOCITY_FIELDS = sorted(gamefeed.EXIT_VELOCITY_SCHEMA.items())
+
+
+def _atbat_rows(root):
+    rows = []
+    for c_inn in root:
+        inning_num = inning._inning_attrs(c_inn.attrib).get('num')
+        for c_half in c_inn:
+            for c_ab in c_half:
+                if c_ab.tag != 'atbat':
+                    continue
+                attrs = inning._atbat_attrs(c_ab.attrib)
+                row = {name: attrs.get(name) for name, _ in ATBAT_FIELDS}
+                row['inning'] = inning_num
+                row['top'] = c_half.tag == 'top'
+                row['start_tfs_zulu'] = timestamps.zulu_epoch(attrs.get('start_tfs_zulu'))
+                rows.append(row)
+    return rows
+
+
+def _exit_velocity_rows(game_id):
+    """Gets a game's exit velocity rows, or None if a request failed."""
+    data = pygd2.get_json(pygd2.game(game_id).gameday_url)
+    if not data:
+        return None
+    game_pk = data['data']['game'].get('game_pk')
+    if not game_pk:
+        return []
+    feed = pygd2.game_feed(game_pk)
+    if feed is None:
+        return None
+    return [{name: getattr(row, name) for name, _ in EXIT_VELOCITY_FIELDS} for row in feed]
+
+
+class Manifest(crawl.JsonLines):
+    """Datasets exported per game, as an append-only JSON lines log.
+
+    Only records of the current schema version count.
+    Args:
+        path: Path of the manifest file; loaded if it exists.
+    """
+
+    def __init__(self, path):
+        self.games = {}
+        super().__init__(path)
+
+    def load(self, record):
+        if record['version'] == SCHEMA_VERSION:
+            self.games.setdefault(record['game'], set()).update(record['rows'])
+
+    def exported(self, game_id, datasets=DATASETS):
+        """Checks whether every one of datasets was exported for a game."""
+        return set(datasets) <= self.games.get(game_id, set())
+
+    def mark(self, game_id, rows):
+        """Records a game's datasets as exported.
+        Args:
+            game_id: Gameday id of the game.
+            rows: Dictionary of dataset name to rows written.
+        """
+        self.append({'game': game_id, 'version': SCHEMA_VERSION, 'rows': rows})
+
+
+def _datasets(exit_velocity):
+    return DATASETS if exit_velocity else tuple(name for name in DATASETS
+                                                 if name != 'exit_velocity')
+
+
+class Warehouse(object):
+    """Parquet datasets of gameday data under a root directory.
+
+    Args:
+        root: Warehouse directory, created if missing.
+    """
+
+    def __init__(self, root):
+        _require_pyarrow()
+        self.root = os.path.abspath(os.path.expanduser(root))
+        os.makedirs(self.root, exist_ok=True)
+        self.manifest = Manifest(os.path.join(self.root, MANIFEST_NAME))
+
+    def partition_dir(self, name, game_id):
+        """Gets the directory holding a game's files of a dataset."""
+        year, month = game_id.split('_')[:2]
+        return os.path.join(self.root, name, 'season=%d' % int(year),
+                            'month=%d' % int(month), 'game_id=' + game_id)
+
+    def _write(self, name, game_id, arrow_table):
+        directory = self.partition_dir(name, game_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, 'part-v%d.parquet' % SCHEMA_VERSION)
+        metadata = dict(arrow_table.schema.metadata or {})
+        metadata[b'pygd2.schema_version'] = str(SCHEMA_VERSION).encode()
+        arrow_table = arrow_table.replace_schema_metadata(metadata)
+        tmp_path = path + '.tmp'
+        pyarrow.parquet.write_table(arrow_table, tmp_path)
+        os.replace(tmp_path, path)
+        for old in glob.glob(os.path.join(directory, 'part-v*.parquet')):
+            if old != path:
+                os.remove(old)
+
+    def export_game(self, game_id, exit_velocity=True):
+        """Writes a game to every dataset it hasn't been exported to yet.
+        Args:
+            game_id: Gameday id of the game.
+            exit_velocity: Also fetch the game's exit velocity feed.
+        Returns:
+            Dictionary of dataset name to rows written, or None if the game
+            was already exported or one of its sources couldn't be fetched;
+            nothing is written or recorded then, so a rerun retries it.
+        """
+        pending = [name for name in _datasets(exit_velocity)
+                   if not self.manifest.exported(game_id, (name,))]
+        if not pending:
+            return None
+        tables = {}
+        if 'pitches' in pending or 'atbats' in pending:
+            root = pygd2.get_xml(pygd2._build_gameday_url(game_id, 'inning', 'inning_all.xml'))
+            if root is None:
+                return None
+            if 'pitches' in pending:
+                tables['pitches'] = pyarrow.Table.from_batches(
+                    [table.PitchTable.from_etree(root, game_id).to_arrow()])
+            if 'atbats' in pending:
+                tables['atbats'] = pyarrow.Table.from_pylist(
+                    _atbat_rows(root), schema=_arrow_schema(ATBAT_FIELDS))
+        if 'exit_velocity' in pending:
+            exit_velocity_rows = _exit_velocity_rows(game_id)
+            if exit_velocity_rows is None:
+                LOG.error("Exit velocity data for %s couldn't be fetched", game_id)
+                return None
+            tables['exit_velocity'] = pyarrow.Table.from_pylist(
+                exit_velocity_rows, schema=_arrow_schema(EXIT_VELOCITY_FIELDS))
+        for name, arrow_table in tables.items():
+            self._write(name, game_id, arrow_table)
+        rows = {name: arrow_table.num_rows for name, arrow_table in tables.items()}
+        self.manifest.mark(game_id, rows)
+        return rows
+
+    def export(self, start, end, exit_velocity=True, workers=WORKERS):
+        """Exports every finished game from start to end.
+
+        Dates less than FINAL_AFTER_DAYS old are skipped, as are games
+        already exported to every requested dataset with the current schema
+        version.
+        Args:
+            start: First date.
+            end: Last date (inclusive).
+            exit_velocity: Also fetch exit velocity feeds.
+            workers: Number of worker threads.
+        Returns:
+            Dictionary with the exported game ids, the number of games
+            skipped and the game ids that failed.
+        """
+        last_final = datetime.date.today() - datetime.timedelta(
+            days=response_cache.FINAL_AFTER_DAYS)
+        dates = list(crawl.date_range(start, min(end, last_final)))
+        datasets = _datasets(exit_velocity)
+        result = {'exported': [], 'skipped': 0, 'failed': []}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            game_ids = [game_id for ids in pool.map(pygd2.list_game_ids, dates)
+                        for game_id in ids]
+            pending = []
+            for game_id in game_ids:
+                if self.manifest.exported(game_id, datasets):
+                    result['skipped'] += 1
+                else:
+                    pending.append((game_id, pool.submit(self.export_game, game_id,
+                                                         exit_velocity)))
+            for game_id, job in pending:
+                try:
+                    rows = job.result()
+                except Exception:  # pylint: disable=broad-except
+                    LOG.exception("Exporting %s failed", game_id)
+                    rows = None
+                if rows is None:
+                    result['failed'].append(game_id)
+                else:
+                    result['exported'].append(game_id)
+        return result
+
+    def dataset(self, name):
+        """Opens a dataset's current-version files as a pyarrow Dataset,
+        with season, month and game_id partition columns."""
+        if name not in DATASETS:
+            raise ValueError("Dataset %s not found." % name)
+        base = os.path.join(self.root, name)
+        paths = glob.glob(os.path.join(base, '*', '*', '*', 'part-v%d.parquet' % SCHEMA_VERSION))
+        return pyarrow.dataset.dataset(paths, format='parquet', partitioning='hive',
+                                       partition_base_dir=base)
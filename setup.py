@@ -21,6 +21,11 @@ setup(
         "pyyaml",
         "sssorm"
     ],
+    extras_require={
+        "aio": ["aiohttp"],
+        "table": ["numpy"],
+        "arrow": ["numpy", "pyarrow"],
+    },
     packages=["pygd2"],
     long_description=read('README.md'),
     classifiers=[